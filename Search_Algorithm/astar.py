@@ -5,6 +5,58 @@ import sys
 import numpy as np
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import (answer_axis, win_pid, lookahead_entropy, index_range, distinct_guesses,
+                                           letter_masks)
+from Search_Algorithm.pattern_rows import load_pattern_data, LazyPatternTable
+from Search_Algorithm.heuristics import load_bound_table, table_bound, max_solvable
+from Search_Algorithm.transposition import zobrist_keys, candidate_fingerprint
+from Search_Algorithm.scoring import (score_guesses, score_counts, get_scorer, batched_histograms, resolve_workers,
+                                      max_partitions, letter_splits)
+
+class _PlanNode:
+    """One candidate set of the AND-OR plan search.
+
+    lb is an admissible lower bound on the worst-case guesses the set still
+    needs and ub the worst case of the best complete plan found for it (inf
+    until there is one), whose first guess is `best`. The guesses are the AND
+    children: `moves` holds the ones not materialized yet, ranked ones first,
+    and move_lbs[i] bounds every move from i on (rest_lb is the next one's);
+    `children` maps a materialized guess to the nodes of its non-winning
+    buckets. and_lb / and_ub keep the backed-up bounds of a guess even after
+    its bucket nodes were evicted; `parents` lists the (node, guess) pairs
+    whose buckets include this set.
+    """
+    __slots__ = ("key", "cands", "lb", "ub", "best", "moves", "move_lbs", "next_move", "rest_lb",
+                 "children", "and_lb", "and_ub", "expanded", "parents")
+    # Rough per-record cost of the slots, dict entries and fingerprint key
+    RECORD_BYTES = 400
+
+    def __init__(self, key, cands, lb, ub=float("inf"), best=-1):
+        self.key = key
+        self.cands = cands
+        self.lb = lb
+        self.ub = ub
+        self.best = best
+        self.moves = None
+        self.move_lbs = None
+        self.next_move = 0
+        self.rest_lb = lb
+        self.children = {}
+        self.and_lb = {}
+        self.and_ub = {}
+        self.expanded = False
+        self.parents = []
+
+    @property
+    def solved(self):
+        return self.lb >= self.ub
+
+    def move_bytes(self):
+        return 0 if self.moves is None else self.moves.nbytes + self.move_lbs.nbytes
+
+    def record_bytes(self):
+        return self.RECORD_BYTES + (0 if self.cands is None else self.cands.nbytes) + self.move_bytes()
+
 
 class AStarSolver:
     DATA_FILE = "static_entropy.pkl"
@@ -12,19 +64,40 @@ class AStarSolver:
     
     _cache_data = None
     _cache_tree = None
+    _cache_static_entropy = None
+
+    # AO* over the AND-OR graph of candidate sets: a guess costs one plus the
+    # worst of its buckets. Every guess in the dictionary is a move. A greedy
+    # plan is completed first, then the search improves on it for at most
+    # NODE_BUDGET expansions.
+    NODE_BUDGET = 200
+    # Byte budget for the plan graph kept in memory by one search. When it is hit
+    # the least promising parts are forgotten down to EVICT_LOW_WATER of the
+    # budget (SMA*-style) and regenerated if the search comes back.
+    MEMORY_BUDGET = 256 * 1024 * 1024
+    EVICT_LOW_WATER = 0.9
+    # Moves ranked on full histograms, picked by their letter-mask bucket bound;
+    # among them, guesses with identical rows over a set of at most
+    # EQUIVALENCE_MAX_CANDIDATES are merged
+    RANKED_SHORTLIST = 512
+    EQUIVALENCE_MAX_CANDIDATES = 256
+    # With lookahead, ties between moves with the same bound are broken by the
+    # two-ply score of the LOOKAHEAD_SHORTLIST first moves instead
+    LOOKAHEAD_SHORTLIST = 16
+    LOOKAHEAD_POOL = 64
 
-    def __init__(self, api):
+    def __init__(self, api, memory_budget=None, lookahead=False, scorer="entropy", workers=1, matrix_free=False):
         self.api = api
         self.target = getattr(api, 'word', None)
         if self.target: self.target = self.target.upper()
         
-        if AStarSolver._cache_data is None:
-            paths = [self.DATA_FILE, os.path.join("Search_Algorithm", self.DATA_FILE), os.path.join("..", self.DATA_FILE), os.path.join(".", self.DATA_FILE)]
-            found = next((p for p in paths if os.path.exists(p)), None)
-            if found:
-                with open(found, 'rb') as f:
-                    AStarSolver._cache_data = pickle.load(f)
-            else:
+        lazy_loaded = AStarSolver._cache_data is not None and isinstance(AStarSolver._cache_data["pattern_table"], LazyPatternTable)
+        if AStarSolver._cache_data is None or (matrix_free and not lazy_loaded):
+            # Shared with DFSSolver so the pattern table is only loaded once per process.
+            # Without the artifact (or with matrix_free) rows are computed on demand instead.
+            AStarSolver._cache_data = load_pattern_data(api.words_list, getattr(api, "answers_list", None), matrix_free)
+            AStarSolver._cache_static_entropy = None
+            if AStarSolver._cache_data is None:
                 raise FileNotFoundError("Thiếu static_entropy.pkl")
 
         if AStarSolver._cache_tree is None:
@@ -46,26 +119,356 @@ class AStarSolver:
         self.full_dictionary = self.data["full_dictionary"]
         self.table = self.data["pattern_table"]
         self.w2i = self.data["word_to_idx"]
+        self.answers, self.answer_rows, self.a2i = answer_axis(self.data)
+        if AStarSolver._cache_static_entropy is None:
+            if "static_entropy" in self.data:
+                AStarSolver._cache_static_entropy = self.data["static_entropy"]
+            else:
+                entropy_map = self.data["entropy_map"]
+                AStarSolver._cache_static_entropy = np.array([entropy_map.get(w, 0.0) for w in self.full_dictionary])
+        self.static_entropy = AStarSolver._cache_static_entropy
+        # Per-size bounds over this dictionary from precompute_bounds.py, tighter than the analytic ones
+        self.bound_table = load_bound_table(len(self.answers))
+        self._fp_keys = zobrist_keys(len(self.answers))
+        self.win_pid = win_pid(len(self.full_dictionary[0]))
+        self.n_patterns = 3 ** len(self.full_dictionary[0])
+        # Largest set solvable within 1, 2, ... guesses, for the vectorized heuristic
+        self._solvable = [1]
+        while self._solvable[-1] < len(self.answers):
+            self._solvable.append(max_solvable(len(self._solvable) + 1, self.n_patterns))
+        self._solvable = np.array(self._solvable, dtype=np.float64)
+        self.all_guesses = index_range(len(self.full_dictionary))
+        self.masks = letter_masks(self.full_dictionary)
+
         self.guesses_history = []
         self.search_time = 0
         self.expanded_nodes = 0
         self.memory_usage = 0
+        self.max_graph_size = 0
+        self.peak_search_bytes = 0
+        self.evicted_states = 0
+        self.regenerated_states = 0
+        self.proven_turns = 0
+        self._nodes = {}
+        self._root = None
+        self._live_bytes = 0
+        self.memory_budget = memory_budget or self.MEMORY_BUDGET
+        self.lookahead = lookahead
+        # Tie-break between moves with the same worst bucket
+        get_scorer(scorer)
+        self.scorer = scorer
+        # Threads for move ranking; they share the cached pattern table
+        self.workers = resolve_workers(workers)
+        self.plan_costs = []
 
-        self.candidates_indices = np.arange(len(self.full_dictionary))
+        self.candidates_indices = index_range(len(self.answers))
 
     def calculate_dynamic_entropy(self, guess_idx, candidate_indices):
-        patterns = self.table[guess_idx, candidate_indices]
-        _, counts = np.unique(patterns, return_counts=True)
-        total = len(candidate_indices)
-        if total == 0: return 0
-        probs = counts / total
-        return -np.sum(probs * np.log2(probs))
+        if len(candidate_indices) == 0: return 0
+        return score_guesses(self.table, [guess_idx], candidate_indices, "entropy", n_patterns=self.n_patterns)[0]
+
+    def _split_keys(self, guesses, candidates):
+        """(largest non-winning bucket, can win, scorer value) of each guess, one block of histograms at a time."""
+        worst = np.empty(len(guesses), dtype=np.int64)
+        can_win = np.empty(len(guesses), dtype=bool)
+        score = np.empty(len(guesses))
+        for start in range(0, len(guesses), self.RANKED_SHORTLIST):
+            block = slice(start, start + self.RANKED_SHORTLIST)
+            counts = batched_histograms(self.table, guesses[block], candidates, self.workers, self.n_patterns)
+            can_win[block] = counts[:, self.win_pid] > 0
+            counts[:, self.win_pid] = 0
+            worst[block] = counts.max(axis=1)
+            score[block] = score_counts(counts, self.scorer)
+        return worst, can_win, score
+
+    def _ranked_moves(self, candidates):
+        """Every guess that may split the set, as (guesses, bounds).
+
+        Letter masks bound the buckets of every guess (max_partitions), so its
+        largest non-winning bucket holds at least its share of the set. Only the
+        RANKED_SHORTLIST guesses with the most possible buckets, the most even
+        letter splits among equals, get histograms and the bound
+        1 + heuristic(largest non-winning bucket); the others keep the
+        admissible bound of that share. A guess whose share bound ties the best
+        ranked bound is ranked too, so every guess that may reach the best
+        bound has an exact one. Ranked guesses come first by increasing bound,
+        the size of that bucket and guesses that can still win first, merged
+        when equivalent and ordered by the scorer; the unranked ones follow by
+        increasing bound.
+        """
+        n = len(candidates)
+        is_candidate = np.zeros(len(self.full_dictionary), dtype=bool)
+        is_candidate[self.answer_rows[candidates]] = True
+        k = max_partitions(self.masks, self.all_guesses, candidates, self.n_patterns, self.answer_rows[candidates])
+        splits = np.flatnonzero(k > 1)
+        evenness = letter_splits(self.masks, splits, candidates, self.answer_rows[candidates])
+        shortlist = np.sort(splits[np.lexsort((-evenness, -k[splits]))[:self.RANKED_SHORTLIST]])
+        rest = np.setdiff1d(splits, shortlist, assume_unique=True)
+        # A candidate leaves n - 1 answers to k - 1 buckets, any other guess n to k
+        share = np.where(is_candidate[rest], -(-(n - 1) // (k[rest] - 1)), -(-n // k[rest]))
+        rest_bounds = 1 + self._size_bounds(share)
+
+        worst, can_win, score = self._split_keys(shortlist, candidates)
+        best = (1 + self._size_bounds(worst[worst < n])).min(initial=np.iinfo(np.uint8).max)
+        tied = rest_bounds <= best
+        if tied.any():
+            # Left unranked, they would hold the set's lower bound under the best
+            # plan until the search materialized them one at a time
+            more = self._split_keys(rest[tied], candidates)
+            shortlist = np.concatenate([shortlist, rest[tied]])
+            order = np.argsort(shortlist)
+            shortlist = shortlist[order]
+            worst, can_win, score = (np.concatenate(pair)[order] for pair in zip((worst, can_win, score), more))
+            rest, rest_bounds = rest[~tied], rest_bounds[~tied]
+        split = np.flatnonzero(worst < n)
+        moves, worst, can_win, score = shortlist[split], worst[split], can_win[split], score[split]
+        bounds = 1 + self._size_bounds(worst)
+        keys = (~can_win, worst, bounds)
+
+        head = np.lexsort(keys)
+        if n <= self.EQUIVALENCE_MAX_CANDIDATES:
+            head = head[np.isin(moves[head], distinct_guesses(self.table, moves[head], candidates))]
+        head = head[np.lexsort((-score[head],) + tuple(key[head] for key in keys))]
+        if self.lookahead and n > 2:
+            top = head[:self.LOOKAHEAD_SHORTLIST]
+            second_pool = moves[head[np.argsort(-score[head], kind="stable")[:self.LOOKAHEAD_POOL]]]
+            two_ply = lookahead_entropy(self.table, moves[top], candidates, second_pool, self.n_patterns)
+            head[:len(top)] = top[np.lexsort((-two_ply, bounds[top]))]
+        # The unranked guesses go behind the ranked ones, by increasing bound too
+        tail = np.argsort(rest_bounds, kind="stable")
+        moves = np.concatenate([moves[head], rest[tail]])
+        bounds = np.concatenate([bounds[head], rest_bounds[tail]])
+        return moves.astype(self.all_guesses.dtype), bounds.astype(np.uint8)
+
+    def heuristic(self, n):
+        return table_bound(n, self.bound_table, self.n_patterns)
+
+    def _size_bounds(self, sizes):
+        """heuristic() of every set size in `sizes`."""
+        if self.bound_table is not None:
+            return self.bound_table[sizes].astype(np.int64)
+        return 1 + np.searchsorted(self._solvable, sizes)
+
+    def _plan_node(self, candidates):
+        fingerprint = candidate_fingerprint(candidates, self._fp_keys)
+        node = self._nodes.get(fingerprint)
+        if node is None:
+            n = len(candidates)
+            if n <= 2:
+                # Guess one of them: it wins, or the other one is left
+                node = _PlanNode(fingerprint, None, n, n, int(self.answer_rows[candidates[0]]))
+            else:
+                node = _PlanNode(fingerprint, candidates, self.heuristic(n))
+            self._live_bytes += node.record_bytes()
+            self._nodes[fingerprint] = node
+        return node
+
+    def _expand(self, node):
+        moves, bounds = self._ranked_moves(node.cands)
+        if node.and_lb or node.children:
+            # Re-expansion after eviction: guesses materialized before keep their bounds
+            seen = np.fromiter(set(node.and_lb) | set(node.children), dtype=np.int64)
+            fresh = ~np.isin(moves, seen)
+            moves, bounds = moves[fresh], bounds[fresh]
+        # Unranked moves may have smaller bounds than ranked ones: keep the bound of every move left
+        bounds = np.minimum.accumulate(bounds[::-1])[::-1]
+        node.moves, node.move_lbs, node.next_move = moves, bounds, 0
+        node.rest_lb = int(bounds[0]) if len(bounds) else float("inf")
+        node.expanded = True
+        self._live_bytes += node.move_bytes()
+        self.max_graph_size = max(self.max_graph_size, len(self._nodes))
+        self.peak_search_bytes = max(self.peak_search_bytes, self._live_bytes)
+
+    def _materialize(self, node):
+        # Moves outside the ranked shortlist were never split: skip the ones that keep the whole set
+        guess_idx = None
+        while node.next_move < len(node.moves):
+            move = int(node.moves[node.next_move])
+            node.next_move += 1
+            patterns = self.table[move, node.cands]
+            if patterns[0] == self.win_pid or (patterns != patterns[0]).any():
+                guess_idx = move
+                break
+        node.rest_lb = int(node.move_lbs[node.next_move]) if node.next_move < len(node.moves) else float("inf")
+        if guess_idx is not None:
+            self._bucket_nodes(node, guess_idx)
+        return guess_idx
+
+    def _bucket_nodes(self, node, guess_idx):
+        patterns = self.table[guess_idx, node.cands]
+        children = [self._plan_node(node.cands[patterns == pid]) for pid in np.unique(patterns) if pid != self.win_pid]
+        for child in children:
+            child.parents.append((node, guess_idx))
+        node.children[guess_idx] = children
+        return children
+
+    def _children(self, node, guess_idx):
+        """Bucket nodes of a materialized guess, regenerated if they were evicted."""
+        children = node.children.get(guess_idx)
+        if children is None:
+            children = self._bucket_nodes(node, guess_idx)
+            self.regenerated_states += len(children)
+        return children
+
+    def _release_moves(self, node):
+        self._live_bytes -= node.move_bytes()
+        node.moves = node.move_lbs = None
+        node.expanded = False
+
+    def _update(self, node, guess_idx=None):
+        """Back up the bounds of `guess_idx` (if given) and of the node itself."""
+        if guess_idx is not None:
+            children = node.children[guess_idx]
+            # Regenerated buckets start from the heuristic again: never lose a bound already backed up
+            node.and_lb[guess_idx] = max(node.and_lb.get(guess_idx, 0), 1 + max((c.lb for c in children), default=0))
+            node.and_ub[guess_idx] = min(node.and_ub.get(guess_idx, float("inf")),
+                                         1 + max((c.ub for c in children), default=0))
+        node.lb = max(node.lb, min(min(node.and_lb.values(), default=float("inf")), node.rest_lb))
+        if node.and_ub:
+            # Cheapest complete plan, and among those the one with the best bound
+            node.best = min(node.and_ub, key=lambda g: (node.and_ub[g], node.and_lb[g]))
+            node.ub = node.and_ub[node.best]
+        if node.solved and node.cands is not None:
+            # A solved set is never searched again: only its best guess is kept
+            self._release_moves(node)
+            self._live_bytes -= node.cands.nbytes
+            node.cands = None
+
+    def _select(self, node):
+        """Materialized guess to descend into, or None when the next move should be materialized."""
+        open_moves = [g for g, lb in node.and_lb.items() if lb < node.and_ub[g] and lb < node.ub]
+        guess_idx = min(open_moves, key=node.and_lb.get) if open_moves else None
+        if guess_idx is None or node.rest_lb < node.and_lb[guess_idx]:
+            return None
+        return guess_idx
+
+    def _forget(self, node):
+        self._live_bytes -= node.record_bytes()
+        del self._nodes[node.key]
+        self.evicted_states += 1
+
+    def _evict(self, target_bytes, path):
+        """Forget the least promising parts of the graph until live bytes <= target.
+
+        Move lists of open sets go first. Then guesses whose bucket nodes are all
+        leaves are cut from their set, worst backed-up bound first: the set keeps
+        that bound in and_lb / and_ub, buckets left without a parent leave the
+        graph, and _children() regenerates them if the search comes back. The
+        root and the current path are never touched.
+        """
+        keep = {id(node) for node, _ in path} | {id(self._root)}
+        victims = sorted((node for node in self._nodes.values() if node.moves is not None and id(node) not in keep),
+                         key=lambda node: -node.lb)
+        for node in victims:
+            if self._live_bytes <= target_bytes:
+                return
+            self._release_moves(node)
+            self.evicted_states += 1
+
+        on_path = {(id(node), guess_idx) for node, guess_idx in path}
+        while self._live_bytes > target_bytes:
+            leaves = [(node.and_lb.get(g, 0), node, g) for node in self._nodes.values()
+                      for g, children in node.children.items()
+                      if (id(node), g) not in on_path and not any(c.children for c in children)]
+            if not leaves:
+                return
+            leaves.sort(key=lambda leaf: -leaf[0])
+            for _, node, guess_idx in leaves:
+                if self._live_bytes <= target_bytes:
+                    return
+                for child in node.children.pop(guess_idx):
+                    child.parents.remove((node, guess_idx))
+                    if not child.parents and id(child) not in keep:
+                        self._forget(child)
+
+    def _check_memory(self, path):
+        self.peak_search_bytes = max(self.peak_search_bytes, self._live_bytes)
+        if self._live_bytes > self.memory_budget:
+            self._evict(int(self.memory_budget * self.EVICT_LOW_WATER), path)
+
+    def _complete(self, node, path=()):
+        """Finish a plan for the set greedily with the first move of every open set, giving it a finite ub."""
+        while not node.solved and node.ub == float("inf"):
+            if not node.expanded:
+                self._expand(node)
+                self.expanded_nodes += 1
+            if node.and_lb:
+                guess_idx = min(node.and_lb, key=node.and_lb.get)
+            else:
+                guess_idx = self._materialize(node)
+            step = path + ((node, guess_idx),)
+            for child in self._children(node, guess_idx):
+                self._complete(child, step)
+                self._check_memory(step)
+            self._update(node, guess_idx)
+
+    def _astar_plan(self, candidates):
+        """AO*: best-first search of the AND-OR graph for the guess with the smallest worst case.
+
+        An OR node is a candidate set and picks a guess; an AND node is a guess and
+        must handle every one of its buckets, so it costs 1 + the worst of them. The
+        search follows the best partial plan by lower bound and expands its tip.
+        It stops when the root's lower bound meets the cost of a complete plan,
+        which is then a minimal worst case, or when NODE_BUDGET runs out.
+        """
+        root = self._plan_node(candidates)
+        self._root = root
+        self._complete(root)
+        self._check_memory([])
+        expansions = 0
+        while not root.solved and expansions < self.NODE_BUDGET:
+            path = []
+            node = root
+            while node.expanded and not node.solved:
+                guess_idx = self._select(node)
+                if guess_idx is None:
+                    guess_idx = self._materialize(node)
+                    if guess_idx is None:
+                        # Only moves that keep the whole set were left
+                        self._update(node)
+                    else:
+                        path.append((node, guess_idx))
+                    break
+                open_children = [c for c in self._children(node, guess_idx) if not c.solved]
+                if not open_children:
+                    # Solved through another parent since this guess was last backed up
+                    self._update(node, guess_idx)
+                    continue
+                path.append((node, guess_idx))
+                node = max(open_children, key=lambda c: c.lb)
+            else:
+                if not node.solved:
+                    self._expand(node)
+                    self._update(node)
+            self.expanded_nodes += 1
+            expansions += 1
+            for parent, guess_idx in reversed(path):
+                self._update(parent, guess_idx)
+
+            self._check_memory(path)
+
+        # The chosen plan never needs more than root.ub guesses; it is minimal once solved
+        self.plan_costs.append(root.ub)
+        self.proven_turns += root.solved
+        return root.best
+
+    def _plan_guess(self, candidates):
+        return self._astar_plan(candidates)
 
     def solve(self, board_state=None, max_turns=None):
         start_time = time.time()
         self.guesses_history = []
         self.expanded_nodes = 0
-        self.candidates_indices = np.arange(len(self.full_dictionary))
+        self.max_graph_size = 0
+        self.peak_search_bytes = 0
+        self.evicted_states = 0
+        self.regenerated_states = 0
+        self.proven_turns = 0
+        self.plan_costs = []
+        # Kept across turns, so a later turn starts from the plan chosen earlier
+        self._nodes = {}
+        self._live_bytes = 0
+        self.candidates_indices = index_range(len(self.answers))
 
         last_guess_idx = -1
         last_pid = -1
@@ -108,23 +511,9 @@ class AStarSolver:
             
             if best_word == "":
                 if len(self.candidates_indices) <= 2:
-                    best_word = self.full_dictionary[self.candidates_indices[0]]
+                    best_word = self.answers[self.candidates_indices[0]]
                 else:
-                    search_space = self.candidates_indices
-                    if len(search_space) > 300:
-                         import random
-                         search_space = np.random.choice(search_space, 300, replace=False)
-
-                    best_score = -1.0
-                    best_word_idx = -1
-                    
-                    for idx in search_space:
-                        self.expanded_nodes += 1
-                        entropy = self.calculate_dynamic_entropy(idx, self.candidates_indices)
-                        if entropy > best_score:
-                            best_score = entropy
-                            best_word_idx = idx
-                    
+                    best_word_idx = self._plan_guess(self.candidates_indices)
                     best_word = self.full_dictionary[best_word_idx]
 
             self.guesses_history.append(best_word)
@@ -133,7 +522,7 @@ class AStarSolver:
             if not self.target: break 
 
             try:
-                t_idx = self.w2i[self.target]
+                t_idx = self.a2i[self.target]
                 g_idx = self.w2i[best_word]
                 real_pid = self.table[g_idx, t_idx]
                 
@@ -150,7 +539,7 @@ class AStarSolver:
         # Calculate memory from data structures
         mem_candidates = self.candidates_indices.nbytes  # NumPy array
         mem_history = sys.getsizeof(self.guesses_history) + sum(sys.getsizeof(w) for w in self.guesses_history)
-        self.memory_usage = mem_candidates + mem_history
+        self.memory_usage = mem_candidates + mem_history + self.peak_search_bytes
         
         return self.guesses_history
 
@@ -179,5 +568,12 @@ class AStarSolver:
             "steps": len(self.guesses_history),
             "search_time": round(self.search_time, 4),
             "Memory Usage": mem_str,
-            "Expanded Nodes": self.expanded_nodes
+            "Expanded Nodes": self.expanded_nodes,
+            "Plan Nodes": self.max_graph_size,
+            "Evicted States": self.evicted_states,
+            "Regenerated States": self.regenerated_states,
+            "Row Cache Hit Rate": f"{self.table.hit_rate():.2%}" if hasattr(self.table, "hit_rate") else "N/A",
+            # Worst case the plan behind each searched guess never exceeds (None: no plan within budget)
+            "Worst-Case Plan": self.plan_costs,
+            "Proven Minimal": self.proven_turns
         }
\ No newline at end of file
@@ -0,0 +1,186 @@
+import os
+import sys
+import time
+import zlib
+import pickle
+import struct
+import threading
+from collections import OrderedDict
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import DATA_FILE, find_artifact, load_static_data, answer_axis, entropy_from_counts
+from Search_Algorithm.pattern_rows import (LazyPatternTable, BlockPatternTable, group_by_block, pattern_dtype,
+                                           dense_fits, locality_order, ROW_CACHE_BYTES)
+
+COMPRESSED_FILE = "pattern_blocks.bin"
+MAGIC = b"WPB1"
+# Rows per independently compressed block. Blocks are stored column-major: the
+# rows of a block agree on most answers, which roughly doubles the zlib ratio
+ROWS_PER_BLOCK = 32
+COMPRESS_LEVEL = 6
+
+_cache_compressed = {}
+
+
+class CompressedPatternTable(BlockPatternTable):
+    """Pattern table [guesses x answers] stored as zlib-compressed row blocks.
+
+    Only the index is read when the table is opened. A read decompresses the
+    blocks holding its rows and keeps them in an LRU cache bounded by cache_bytes.
+    By default the cache holds the whole table when it fits in memory, so every
+    block is decompressed once; otherwise it is bounded like the row cache.
+    """
+
+    def __init__(self, path, cache_bytes=None):
+        self.path = path
+        self._file = open(path, 'rb')
+        if self._file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a compressed pattern table")
+        header_size, = struct.unpack("<Q", self._file.read(8))
+        self.header = pickle.loads(self._file.read(header_size))
+        self.data_start = len(MAGIC) + 8 + header_size
+        self.shape = tuple(self.header["shape"])
+        self.dtype = np.dtype(self.header["dtype"])
+        self.big_endian = self.header["big_endian"]
+        self.rows_per_block = self.header["rows_per_block"]
+        self.offsets = self.header["offsets"]
+        block_bytes = self.rows_per_block * self.shape[1] * self.dtype.itemsize
+        if cache_bytes is None:
+            table_bytes = self.shape[0] * self.shape[1] * self.dtype.itemsize
+            cache_bytes = table_bytes if dense_fits(table_bytes) else ROW_CACHE_BYTES
+        self.max_blocks = max(1, -(-cache_bytes // block_bytes))
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+
+    @property
+    def nbytes(self):
+        return sum(block.nbytes for block in self._blocks.values())
+
+    def _block(self, b):
+        with self._lock:
+            block = self._blocks.get(b)
+            if block is not None:
+                self._blocks.move_to_end(b)
+                self.hits += 1
+                return block
+            self._file.seek(self.data_start + int(self.offsets[b]))
+            payload = self._file.read(int(self.offsets[b + 1] - self.offsets[b]))
+            self.misses += 1
+            self.bytes_read += len(payload)
+        n_rows = min(self.rows_per_block, self.shape[0] - b * self.rows_per_block)
+        # Kept column-major as stored: gathering candidate columns reads contiguous runs
+        block = np.frombuffer(zlib.decompress(payload), dtype=self.dtype).reshape(self.shape[1], n_rows).T
+        with self._lock:
+            self._blocks[b] = block
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+        return block
+
+    def _read(self, guess_indices, answer_indices):
+        guess_indices = np.asarray(guess_indices, dtype=np.intp)
+        answer_indices = np.asarray(answer_indices, dtype=np.intp)
+        out = np.empty((len(guess_indices), len(answer_indices)), dtype=self.dtype)
+        for b, positions in group_by_block(guess_indices, self.rows_per_block):
+            local_rows = guess_indices[positions] - b * self.rows_per_block
+            out[positions] = self._block(b)[np.ix_(local_rows, answer_indices)]
+        return out
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def build_compressed_matrix(words, answers=None, path=COMPRESSED_FILE, table=None, big_endian=False,
+                            rows_per_block=ROWS_PER_BLOCK, level=COMPRESS_LEVEL, locality=False):
+    """Write words x answers as compressed row blocks behind an index of byte offsets.
+
+    Rows come from `table` (anything indexable like the dense table) or are
+    computed with the pattern kernel, one block at a time. With locality both
+    axes are stored in locality_order. Returns the ratio.
+    """
+    square = answers is None or answers is words
+    words = [w.upper() for w in words]
+    answers = words if square else [w.upper() for w in answers]
+    if locality:
+        guess_order = locality_order(words)
+        answer_order = guess_order if square else locality_order(answers)
+        if table is not None:
+            table = np.asarray(table)[np.ix_(guess_order, answer_order)]
+        words = [words[i] for i in guess_order]
+        answers = words if square else [answers[i] for i in answer_order]
+    if table is None:
+        table = LazyPatternTable(words, None if square else answers, cache_bytes=0, big_endian=big_endian)
+    n_patterns = 3 ** len(words[0])
+    static_entropy = np.zeros(len(words))
+    blocks, offsets = [], [0]
+    for start in range(0, len(words), rows_per_block):
+        rows = np.asarray(table[np.arange(start, min(start + rows_per_block, len(words)))], dtype=pattern_dtype(len(words[0])))
+        keys = rows.astype(np.intp) + np.arange(len(rows), dtype=np.intp)[:, None] * n_patterns
+        counts = np.bincount(keys.ravel(), minlength=len(rows) * n_patterns).reshape(len(rows), n_patterns)
+        static_entropy[start:start + len(rows)] = entropy_from_counts(counts)
+        blocks.append(zlib.compress(rows.T.tobytes(), level))
+        offsets.append(offsets[-1] + len(blocks[-1]))
+        print(f"Progress: {start + len(rows)}/{len(words)} rows", end='\r')
+    header = pickle.dumps({
+        "shape": (len(words), len(answers)),
+        "dtype": np.dtype(pattern_dtype(len(words[0]))).str,
+        "big_endian": big_endian,
+        "rows_per_block": rows_per_block,
+        "offsets": np.array(offsets, dtype=np.uint64),
+        "full_dictionary": words,
+        "answers": answers,
+        "static_entropy": static_entropy,
+    })
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for block in blocks:
+            f.write(block)
+    return len(words) * len(answers) * np.dtype(pattern_dtype(len(words[0]))).itemsize / offsets[-1]
+
+
+def load_compressed_data(path=COMPRESSED_FILE):
+    """Data pack over the compressed artifact, shaped like static_entropy.pkl. None if it is missing."""
+    found = find_artifact(path)
+    if found is None:
+        return None
+    if found not in _cache_compressed:
+        table = CompressedPatternTable(found)
+        words, answers = table.header["full_dictionary"], table.header["answers"]
+        word_to_idx = {w: i for i, w in enumerate(words)}
+        _cache_compressed[found] = {
+            "pattern_table": table,
+            "static_entropy": table.header["static_entropy"],
+            "entropy_map": dict(zip(words, table.header["static_entropy"].tolist())),
+            "full_dictionary": words,
+            "word_to_idx": word_to_idx,
+            "answers": answers,
+            "answer_rows": np.array([word_to_idx[w] for w in answers]),
+        }
+    return _cache_compressed[found]
+
+
+if __name__ == "__main__":
+    # python compressed_matrix.py [word file] [word length] [--locality]
+    locality = "--locality" in sys.argv
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    t0 = time.time()
+    data = load_static_data()
+    if data is not None:
+        # Repack the dense artifact with the same pattern ids
+        print(f"🚀 Compressing {DATA_FILE}...")
+        answers, _, _ = answer_axis(data)
+        ratio = build_compressed_matrix(data["full_dictionary"], answers, table=data["pattern_table"],
+                                        locality=locality)
+    else:
+        from words_api import Words
+        api = Words(int(args[1]) if len(args) > 1 else 5, args[0] if args else None)
+        print(f"🚀 Computing and compressing {len(api.words_list)} x {len(api.answers_list)} patterns...")
+        ratio = build_compressed_matrix(api.words_list, api.answers_list, locality=locality)
+    print(f"\n✅ Done in {time.time()-t0:.2f}s. Saved {COMPRESSED_FILE} "
+          f"({os.path.getsize(COMPRESSED_FILE) / 2**20:.1f} MB, {ratio:.2f}x smaller)")
@@ -2,12 +2,115 @@ import os
 import time
 import random
 import sys
-from collections import deque
+import atexit
+import numpy as np
+from multiprocessing import Pool, Value, RawArray, cpu_count
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import (load_static_data, set_static_data, share_table, attach_table, feedback_to_pid,
+                                           win_pid, filter_indices, pattern_histograms, entropy_from_counts, index_dtype,
+                                           index_range)
+from Search_Algorithm.transposition import TranspositionTable, zobrist_keys, candidate_fingerprint
+
+# Root-split workers: each process attaches once to the shared pattern table and
+# builds one DFSSolver per solve; the root candidates of a solve are read from a
+# shared buffer, and a shared solve id cancels every branch of an older solve
+worker_shm = None
+worker_words = None
+worker_active = None
+worker_root = None
+worker_solver = None
+worker_solve_id = None
+worker_candidates = None
+
+
+class _SearchCancelled(Exception):
+    pass
+
+
+class _SolveToken:
+    """Stop flag of one parallel solve: set as soon as the shared active id moves on."""
+
+    def __init__(self, active, solve_id):
+        self.active = active
+        self.solve_id = solve_id
+
+    def is_set(self):
+        return self.active.value != self.solve_id
+
+
+class _SecretWordAPI:
+    def __init__(self, words_list, word):
+        self.words_list = words_list
+        self.word = word
+
+    def is_valid_guess(self, guess):
+        return guess == self.word
+
+
+def init_root_worker(table_descriptor, data_pack, words, active, root, root_size):
+    global worker_shm, worker_words, worker_active, worker_root
+    worker_shm, table = attach_table(table_descriptor)
+    set_static_data(dict(data_pack, pattern_table=table))
+    worker_words = words
+    worker_active = active
+    worker_root = (root, root_size)
+
+
+def expand_root_branch(task):
+    # Same work as one iteration of the root loop in DFSSolver._dfs_recursive
+    global worker_solver, worker_solve_id, worker_candidates
+    solve_id, secret_word, move_ordering, iterative_deepening, path, depth, guess_idx = task
+    if worker_active.value != solve_id:
+        return None, 0
+    if worker_solve_id != solve_id:
+        worker_solver = DFSSolver(_SecretWordAPI(worker_words, secret_word),
+                                  move_ordering=move_ordering, iterative_deepening=iterative_deepening)
+        worker_solver._scratch = np.empty((DFSSolver.MAX_DEPTH + 1, len(worker_words)),
+                                          dtype=index_dtype(len(worker_words)))
+        worker_solver._stop_event = _SolveToken(worker_active, solve_id)
+        root, root_size = worker_root
+        worker_candidates = np.frombuffer(root, dtype=index_dtype(len(worker_words)))[:root_size.value].copy()
+        worker_solve_id = solve_id
+    solver = worker_solver
+    candidates = worker_candidates
+    solver.expanded_nodes = 1
+    guess = solver.all_words[guess_idx]
+    pid = solver._secret_pid(guess)
+    if pid == solver.win_pid:
+        return path + [guess], solver.expanded_nodes
+    child = solver._filter_candidates(candidates, guess, pid)
+    try:
+        result = solver._search(child, path + [guess], depth + 1)
+    except _SearchCancelled:
+        result = None
+    return result, solver.expanded_nodes
+
 
 class DFSSolver:
     MASTER_START_WORDS = ['SLATE', 'CRANE', 'SOARE', 'RAISE', 'TRACE']
+    MAX_DEPTH = 20
+    TT_MAX_ENTRIES = 100000
+    MOVE_ORDERINGS = ["dictionary", "static", "live"]
+    # Live ordering builds a [candidates x candidates] histogram, so it is only
+    # used on small sets; larger sets fall back to static entropy.
+    LIVE_ORDER_LIMIT = 400
+    # Iterative deepening only tries the best few children per node; otherwise the
+    # shallowest "path" is always a linear scan for the goal among the candidates.
+    ID_BRANCHING = 3
+    # Root-split parallelism only pays off once the root has many branches
+    PARALLEL_MIN_CANDIDATES = 200
+    # Nodes between two looks at the cancel flag of a parallel solve (a plain shared int)
+    STOP_CHECK_INTERVAL = 16
+
+    # Root-split pool, kept across solves for the same table and worker count
+    _pool = None
+    _pool_key = None
+    _pool_active = None
+    _pool_root = None
+    _solve_counter = 0
     
-    def __init__(self, word_api):
+    def __init__(self, word_api, move_ordering="dictionary", iterative_deepening=False, workers=None):
         self.word_api = word_api
         self.all_words = self.word_api.words_list.copy()
         self.secret_word = self.word_api.word
@@ -17,6 +120,46 @@ class DFSSolver:
         self.total_guesses = 0
         self.full_solution_path = []
         self.max_stack_size = 0
+        if move_ordering not in self.MOVE_ORDERINGS:
+            raise ValueError(f"Unknown move ordering: {move_ordering}")
+        self.move_ordering = move_ordering
+        self.iterative_deepening = iterative_deepening
+        self.deepening_iterations = 0
+        self._branch_limit = None
+        # workers=None or 1 keeps the search in this process; 0 means one per CPU core.
+        # More workers than cores would only time-slice the branches, so a single
+        # core always searches serially
+        self.workers = min(cpu_count() if workers == 0 else (workers or 1), os.cpu_count() or 1)
+        self.parallel_branches = 0
+        self.drained_nodes = 0
+        self._stop_event = None
+
+        # Candidate sets are index arrays into all_words. The pattern table from
+        # static_entropy.pkl is only usable when it was built for the words of this
+        # list, with every word as an answer (a square table). A table stored in
+        # another order (a locality build) keeps its order: words are mapped
+        # through its word_to_idx, and dictionary ordering still follows the list.
+        self.w2i = {w: i for i, w in enumerate(self.all_words)}
+        self.table = None
+        self._list_rank = None
+        data = load_static_data()
+        self.static_entropy = None
+        if (data is not None and len(data["full_dictionary"]) == len(self.all_words)
+                and data["pattern_table"].shape[1] == len(self.all_words)
+                and all(w in data["word_to_idx"] for w in self.all_words)):
+            if data["full_dictionary"] != self.all_words:
+                self._list_rank = np.empty(len(self.all_words), dtype=np.int64)
+                self._list_rank[[data["word_to_idx"][w] for w in self.all_words]] = np.arange(len(self.all_words))
+                self.all_words = list(data["full_dictionary"])
+                self.w2i = data["word_to_idx"]
+            self.table = data["pattern_table"]
+            entropy_map = data["entropy_map"]
+            self.static_entropy = np.array([entropy_map.get(w, 0.0) for w in self.all_words])
+        self.win_pid = win_pid(len(self.secret_word))
+        self.secret_idx = self.w2i.get(self.secret_word, -1)
+        self._scratch = None
+        self.tt = TranspositionTable(self.TT_MAX_ENTRIES)
+        self._tt_keys = zobrist_keys(len(self.all_words))
     
     def _calculate_feedback(self, guess, secret):
         feedback = [''] * len(secret)
@@ -40,67 +183,183 @@ class DFSSolver:
         
         return feedback
 
-    def _filter_candidates(self, candidates, guess, feedback):
-        new_candidates = []
-        for word in candidates:
-            if self._calculate_feedback(guess, word) == feedback:
-                new_candidates.append(word)
-        return new_candidates
+    def _pattern_row(self, guess, candidates):
+        if self.table is not None and guess in self.w2i:
+            return self.table[self.w2i[guess], candidates]
+        # No matching matrix (other word sizes): fall back to string feedback
+        return np.fromiter((feedback_to_pid(self._calculate_feedback(guess, self.all_words[c])) for c in candidates),
+                           dtype=np.uint16, count=len(candidates))
+
+    def _secret_pid(self, guess):
+        if self.table is not None and guess in self.w2i and self.secret_idx >= 0:
+            return int(self.table[self.w2i[guess], self.secret_idx])
+        return feedback_to_pid(self._calculate_feedback(guess, self.secret_word))
+
+    def _filter_candidates(self, candidates, guess, pid, out=None):
+        if self.table is not None and guess in self.w2i:
+            return filter_indices(self.table, self.w2i[guess], candidates, pid, out=out)
+        keep = np.flatnonzero(self._pattern_row(guess, candidates) == pid)
+        if out is None:
+            return candidates[keep]
+        return np.take(candidates, keep, out=out[:len(keep)])
     
+    def _order_children(self, candidates):
+        if self.move_ordering == "dictionary" or self.table is None:
+            ordered = candidates
+            if self._list_rank is not None:
+                ordered = candidates[np.argsort(self._list_rank[candidates], kind="stable")]
+        else:
+            if self.move_ordering == "live" and len(candidates) <= self.LIVE_ORDER_LIMIT:
+                counts = pattern_histograms(self.table, candidates, candidates, 3 ** len(self.secret_word))
+                scores = entropy_from_counts(counts)
+            else:
+                scores = self.static_entropy[candidates]
+            # Stable sort keeps dictionary order between equal scores
+            ordered = candidates[np.argsort(-scores, kind="stable")]
+        if self._branch_limit is not None:
+            ordered = ordered[:self._branch_limit]
+        return ordered.tolist()
+
     def _dfs_recursive(self, candidates, path, depth, max_depth=20):
         if depth >= max_depth:
             return None
         
-        if not candidates:
+        if len(candidates) == 0:
             return None
         if len(candidates) == 1:
-            guess = candidates[0]
-            feedback = self._calculate_feedback(guess, self.secret_word)
+            guess = self.all_words[candidates[0]]
             self.expanded_nodes += 1
             
-            if all(f == 'G' for f in feedback):
+            if self._secret_pid(guess) == self.win_pid:
                 return path + [guess]
             return None
-        for i, guess in enumerate(candidates):
+        # The same candidate set can be reached through different guess orders
+        fingerprint = candidate_fingerprint(candidates, self._tt_keys)
+        remaining = max_depth - depth
+        entry = self.tt.probe(fingerprint, remaining)
+        if entry is not None:
+            flag, _, suffix = entry
+            return path + suffix if flag == TranspositionTable.SOLVED else None
+        # Children of this node are written into the scratch row of the next depth
+        child_buffer = self._scratch[depth + 1]
+        for guess_idx in self._order_children(candidates):
             self.expanded_nodes += 1
+            if (self._stop_event is not None and self.expanded_nodes % self.STOP_CHECK_INTERVAL == 0
+                    and self._stop_event.is_set()):
+                raise _SearchCancelled()
             if depth > 6 and self.expanded_nodes % 100 == 0:
                 print(f"[DFS] Depth {depth}: Expanded {self.expanded_nodes} nodes")
-            feedback = self._calculate_feedback(guess, self.secret_word)
+            guess = self.all_words[guess_idx]
+            pid = self._secret_pid(guess)
             new_path = path + [guess]
-            if all(f == 'G' for f in feedback):
+            if pid == self.win_pid:
                 return new_path
-            new_candidates = self._filter_candidates(candidates, guess, feedback)
-            if guess in new_candidates:
-                new_candidates.remove(guess)
+            # The guess always lands in the win bucket, so it never survives a non-win filter
+            new_candidates = self._filter_candidates(candidates, guess, pid, out=child_buffer)
             result = self._dfs_recursive(new_candidates, new_path, depth + 1, max_depth)
             if result is not None:
+                self.tt.store_solution(fingerprint, result[len(path):])
                 return result
+        self.tt.store_failure(fingerprint, remaining)
         return None
 
+    def _root_pool(self):
+        """The root-split pool for this table and worker count, started on first use."""
+        key = (id(self.table), self.workers)
+        if DFSSolver._pool_key != key:
+            _close_root_pool()
+            data = load_static_data()
+            data_pack = {"entropy_map": data["entropy_map"], "full_dictionary": data["full_dictionary"],
+                         "word_to_idx": data["word_to_idx"]}
+            DFSSolver._pool_active = Value('q', 0, lock=False)
+            DFSSolver._pool_root = (RawArray(np.ctypeslib.as_ctypes_type(index_dtype(len(self.all_words))),
+                                             len(self.all_words)), Value('q', 0, lock=False))
+            initargs = (share_table(self.table), data_pack, list(self.word_api.words_list), DFSSolver._pool_active,
+                        *DFSSolver._pool_root)
+            DFSSolver._pool = Pool(processes=self.workers, initializer=init_root_worker, initargs=initargs)
+            DFSSolver._pool_key = key
+        return DFSSolver._pool
+
+    def _search_parallel(self, candidates, path, depth):
+        # First-level branches are independent: farm them out in the serial order
+        # and take the first branch to come back with a path, whichever finishes
+        # first. Moving the active solve id on cancels the branches still running
+        # and skips the queued ones. Their results are only drained to count the
+        # nodes they expanded before they saw it, which is a partial count.
+        pool = self._root_pool()
+        root, root_size = DFSSolver._pool_root
+        np.frombuffer(root, dtype=candidates.dtype)[:len(candidates)] = candidates
+        root_size.value = len(candidates)
+        DFSSolver._solve_counter += 1
+        solve_id = DFSSolver._solve_counter
+        DFSSolver._pool_active.value = solve_id
+        branches = self._order_children(candidates)
+        self.parallel_branches = len(branches)
+        tasks = [(solve_id, self.secret_word, self.move_ordering, self.iterative_deepening, path, depth, g)
+                 for g in branches]
+        result = None
+        try:
+            for branch_result, nodes in pool.imap_unordered(expand_root_branch, tasks):
+                if result is not None:
+                    self.drained_nodes += nodes
+                    continue
+                self.expanded_nodes += nodes
+                if branch_result is not None:
+                    result = branch_result
+                    DFSSolver._pool_active.value = 0
+        finally:
+            DFSSolver._pool_active.value = 0
+        return result
+
+    def _search(self, candidates, path, depth):
+        if (self.workers > 1 and self.table is not None and self._stop_event is None
+                and len(candidates) >= self.PARALLEL_MIN_CANDIDATES):
+            return self._search_parallel(candidates, path, depth)
+        if not self.iterative_deepening:
+            return self._dfs_recursive(candidates, path, depth, max_depth=self.MAX_DEPTH)
+        # Raise the depth limit one guess at a time so the shortest path is found
+        # first. Failures proven at shallow limits stay in the transposition table.
+        self._branch_limit = self.ID_BRANCHING
+        try:
+            for limit in range(depth + 1, self.MAX_DEPTH + 1):
+                self.deepening_iterations += 1
+                result = self._dfs_recursive(candidates, path, depth, max_depth=limit)
+                if result is not None:
+                    return result
+        finally:
+            self._branch_limit = None
+        # Failures above were proven with a capped branching factor, so they do
+        # not hold for the full search
+        self.tt.clear()
+        return self._dfs_recursive(candidates, path, depth, max_depth=self.MAX_DEPTH)
+
     def solve(self, board_state):
         start_time = time.time()
         self.expanded_nodes = 0
         self.max_stack_size = 0
+        self.deepening_iterations = 0
+        self.parallel_branches = 0
+        self.drained_nodes = 0
+        self.tt.clear()
         print(f"[DFS Solver] Goal word: {self.secret_word}")
-        candidate_words = self.all_words.copy()
+        self._scratch = np.empty((self.MAX_DEPTH + 1, len(self.all_words)), dtype=index_dtype(len(self.all_words)))
+        candidate_words = index_range(len(self.all_words))
         initial_path = []
         for guess, feedback in board_state:
             initial_path.append(guess)
-            candidate_words = self._filter_candidates(candidate_words, guess, feedback)
+            candidate_words = self._filter_candidates(candidate_words, guess, feedback_to_pid(feedback))
         if not board_state:
             start_word = random.choice(self.MASTER_START_WORDS)
-            feedback = self._calculate_feedback(start_word, self.secret_word)
+            pid = self._secret_pid(start_word)
             self.expanded_nodes += 1
             
-            if all(f == 'G' for f in feedback):
+            if pid == self.win_pid:
                 self.full_solution_path = [start_word]
                 self.total_guesses = 1
                 print(f">>> DFS Found Target in 1 guess!")
             else:
-                candidate_words = self._filter_candidates(candidate_words, start_word, feedback)
-                if start_word in candidate_words:
-                    candidate_words.remove(start_word)
-                result = self._dfs_recursive(candidate_words, [start_word], depth=1, max_depth=20)
+                candidate_words = self._filter_candidates(candidate_words, start_word, pid)
+                result = self._search(candidate_words, [start_word], depth=1)
                 if result:
                     self.full_solution_path = result
                     self.total_guesses = len(result)
@@ -110,8 +369,8 @@ class DFSSolver:
                     self.full_solution_path = [start_word]
                     self.total_guesses = 1
         else:
-            if candidate_words:
-                result = self._dfs_recursive(candidate_words, initial_path, depth=len(initial_path), max_depth=20)
+            if len(candidate_words) > 0:
+                result = self._search(candidate_words, initial_path, depth=len(initial_path))
                 if result:
                     new_steps = result[len(initial_path):]
                     self.full_solution_path = new_steps
@@ -127,8 +386,8 @@ class DFSSolver:
                 self.total_guesses = len(initial_path)
         self.time_taken = time.time() - start_time
         
-        # Approximate memory: candidate list + path
-        mem_candidates = sys.getsizeof(candidate_words) + sum(sys.getsizeof(w) for w in candidate_words)
+        # Approximate memory: candidate index arrays (root + per-depth scratch) + path
+        mem_candidates = candidate_words.nbytes + self._scratch.nbytes + sys.getsizeof(self.tt.entries)
         mem_path = sys.getsizeof(self.full_solution_path) + sum(sys.getsizeof(w) for w in self.full_solution_path)
         self.memory_usage = mem_candidates + mem_path
         
@@ -149,5 +408,17 @@ class DFSSolver:
             "Expanded Nodes": self.expanded_nodes,
             "Total Guesses": self.total_guesses,
             "Memory Usage": mem_str,
+            "Deepening Iterations": self.deepening_iterations,
+            "Parallel Branches": self.parallel_branches,
+            "Cancelled Branch Nodes": f"{self.drained_nodes} (partial)",
+            "TT Hit Rate": f"{self.tt.hit_rate():.2%} ({self.tt.hits}/{self.tt.probes})",
             "Status": "Win" if self.full_solution_path and self.word_api.is_valid_guess(self.full_solution_path[-1] if self.full_solution_path else "") else "Failed"
-        }
\ No newline at end of file
+        }
+
+@atexit.register
+def _close_root_pool():
+    if DFSSolver._pool is not None:
+        DFSSolver._pool.terminate()
+        DFSSolver._pool.join()
+    DFSSolver._pool = None
+    DFSSolver._pool_key = None
@@ -3,61 +3,187 @@ import math
 import time
 import os
 import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import (lookahead_entropy, distinct_guesses, letter_masks, informative_guesses,
+                                           letter_signatures, update_hard_mode_mask, index_dtype, index_range)
+from Search_Algorithm.scoring import (score_guesses, get_scorer, best_guess, estimate_best_guess, resolve_workers,
+                                      max_partitions)
+from Search_Algorithm.pattern_rows import LazyPatternTable, dense_fits, load_stored_data
 
 class EntropySolver:
     _matrix = None
     _matrix_loaded = False
     _all_words_cached = None
     _word_to_index_cached = None
-    def __init__(self, word_api):
+    _answers_cached = None
+    _answer_rows_cached = None
+    # Two-ply scoring: best one-ply guesses rescored, and second guesses tried inside each bucket
+    LOOKAHEAD_SHORTLIST = 16
+    LOOKAHEAD_POOL = 64
+    # early_scorer (if given) replaces scorer while more candidates than this are left
+    EARLY_SCORER_MIN_CANDIDATES = 1000
+    # Up to this many candidates, guesses with identical pattern rows are scored once
+    EQUIVALENCE_MAX_CANDIDATES = 256
+    # Above this many candidates entropy is estimated on nested candidate samples
+    SAMPLE_MIN_CANDIDATES = 1000
+    SAMPLE_SIZE = 256
+    SAMPLE_Z = 2.0
+    # Hard mode searches all legal words only while more candidates than this are left;
+    # below it a candidate, which can also win, is worth more than a better split
+    HARD_POOL_MIN_CANDIDATES = 16
+    # Legal non-candidates scored next to the candidates, the ones with the most possible buckets;
+    # 64 played exactly like candidates only, 1024 plays every game of the full legal pool
+    HARD_POOL_SHORTLIST = 1024
+    def __init__(self, word_api, lookahead=False, scorer="entropy", early_scorer=None, workers=1, matrix_free=False):
         self.word_api = word_api
-        if not EntropySolver._matrix_loaded:
+        # Scoring threads (0 = all cores); they share the cached matrix
+        self.workers = resolve_workers(workers)
+        self.lookahead = lookahead
+        get_scorer(scorer)
+        if early_scorer is not None: get_scorer(early_scorer)
+        self.scorer = scorer
+        self.early_scorer = early_scorer
+        if not EntropySolver._matrix_loaded or (matrix_free and not isinstance(EntropySolver._matrix, LazyPatternTable)):
             self.all_words = list(word_api.words_list)
             self.word_to_index = {w: i for i, w in enumerate(self.all_words)}
+            self.answers = list(getattr(word_api, "answers_list", None) or self.all_words)
             
             base_dir = os.path.dirname(os.path.abspath(__file__))
             matrix_path = os.path.join(base_dir, "pattern_matrix.npy")
-            if not os.path.exists(matrix_path):
-                raise FileNotFoundError("Please run generate_matrix.py first!")
-            print("Loading Pattern Matrix into RAM... (one-time load)")
-            EntropySolver._matrix = np.load(matrix_path)
+            if matrix_free or not os.path.exists(matrix_path) or not dense_fits(os.path.getsize(matrix_path)):
+                stored = None if matrix_free else load_stored_data(self.all_words)
+                if stored is not None:
+                    # Compressed row blocks or on-disk tiles, read as scoring needs them
+                    print(f"Reading Pattern Matrix from {type(stored['pattern_table']).__name__}.")
+                    EntropySolver._matrix = stored["pattern_table"]
+                    # The artifact's word order (possibly a locality build) replaces the list order
+                    self.all_words = stored["full_dictionary"]
+                    self.word_to_index = stored["word_to_idx"]
+                    self.answers = stored["answers"]
+                else:
+                    # Matrix-free: rows are computed when read and the hot ones kept in an LRU cache
+                    print("Pattern Matrix not loaded, computing rows on demand.")
+                    square = self.answers == self.all_words
+                    EntropySolver._matrix = LazyPatternTable(self.all_words, None if square else self.answers,
+                                                             big_endian=True)
+            else:
+                print("Loading Pattern Matrix into RAM... (one-time load)")
+                EntropySolver._matrix = np.load(matrix_path)
+            # Rows are guesses, columns are answers; a square matrix has every word as an answer
+            if EntropySolver._matrix.shape[1] != len(self.answers):
+                self.answers = self.all_words
+            self.answer_rows = np.array([self.word_to_index[w] for w in self.answers], dtype=index_dtype(len(self.all_words)))
             EntropySolver._all_words_cached = self.all_words
             EntropySolver._word_to_index_cached = self.word_to_index
+            EntropySolver._answers_cached = self.answers
+            EntropySolver._answer_rows_cached = self.answer_rows
             EntropySolver._matrix_loaded = True
             print("Matrix Loaded and Cached.")
         else:
             self.all_words = EntropySolver._all_words_cached
             self.word_to_index = EntropySolver._word_to_index_cached
+            self.answers = EntropySolver._answers_cached
+            self.answer_rows = EntropySolver._answer_rows_cached
+        self.n_patterns = 3 ** len(self.all_words[0])
         self.start_time = 0
         self.total_operations = 0
         self.expanded_nodes = 0
         self.solution_path = []
         self.memory_usage = 0
+        self.pruned_guesses = 0
+        self.shortlist_cut = 0
+        self.bound_pruned = 0
+        self.sampled_turns = 0
+        self.index_bytes = 0
+        self.wide_index_bytes = 0
     @property
     def matrix(self):
         return EntropySolver._matrix
+    def _pattern_int(self, feedback):
+        # pattern_matrix.npy reads the first letter as the most significant digit,
+        # tables in the static_entropy.pkl layout as the least significant one
+        digits = [2 if c == 'G' else (1 if c == 'Y' else 0) for c in feedback]
+        if not getattr(self.matrix, "big_endian", True):
+            digits.reverse()
+        pattern_int = 0
+        for val in digits:
+            pattern_int = pattern_int * 3 + val
+        return pattern_int
+    def _count_indices(self, *index_arrays):
+        # Index bytes handed to table reads, next to what int64 indices would move
+        for indices in index_arrays:
+            self.index_bytes += indices.nbytes
+            self.wide_index_bytes += indices.size * np.dtype(np.int64).itemsize
     def _calculate_entropy_vectorized(self, guess_idx, candidate_indices):
-        patterns = self.matrix[guess_idx, candidate_indices]
         self.total_operations += len(candidate_indices)
-        _, counts = np.unique(patterns, return_counts=True)
-        probs = counts / len(candidate_indices)
-        entropy = -np.sum(probs * np.log2(probs))
-        return entropy
+        return score_guesses(self.matrix, [guess_idx], candidate_indices, "entropy", n_patterns=self.n_patterns)[0]
+    def _active_scorer(self, candidate_indices):
+        if self.early_scorer is not None and len(candidate_indices) > self.EARLY_SCORER_MIN_CANDIDATES:
+            return self.early_scorer
+        return self.scorer
+    def _score_guesses(self, guess_indices, candidate_indices):
+        self.total_operations += len(guess_indices) * len(candidate_indices)
+        return score_guesses(self.matrix, guess_indices, candidate_indices, self._active_scorer(candidate_indices),
+                             self.workers, self.n_patterns)
+    def _best_guess_bounded(self, guess_indices, candidate_indices):
+        # Equal scores go to a candidate, which can also win right away
+        candidate_rows = self.answer_rows[candidate_indices]
+        is_candidate = np.isin(guess_indices, candidate_rows)
+        guess_idx, _, evaluated, pruned = best_guess(self.matrix, guess_indices, candidate_indices,
+                                                     letter_masks(self.all_words),
+                                                     self._active_scorer(candidate_indices), prefer=is_candidate,
+                                                     workers=self.workers, candidate_rows=candidate_rows,
+                                                     n_patterns=self.n_patterns)
+        self.total_operations += evaluated * len(candidate_indices)
+        self.bound_pruned += pruned
+        return guess_idx
+    def _estimate_best_guess(self, guess_indices, candidate_indices):
+        is_candidate = np.isin(guess_indices, self.answer_rows[candidate_indices])
+        guess_idx, _, cells, _ = estimate_best_guess(self.matrix, guess_indices, candidate_indices,
+                                                     self.SAMPLE_SIZE, self.SAMPLE_Z, prefer=is_candidate,
+                                                     workers=self.workers, n_patterns=self.n_patterns)
+        self.total_operations += cells
+        self.sampled_turns += 1
+        return guess_idx
+    def _hard_shortlist(self, masks, guess_indices, candidate_indices):
+        # Candidates stay, the other legal words are cut by their letter-mask bucket bound
+        candidate_rows = self.answer_rows[candidate_indices]
+        is_candidate = np.isin(guess_indices, candidate_rows)
+        others = guess_indices[~is_candidate]
+        if len(others) > self.HARD_POOL_SHORTLIST:
+            bound = max_partitions(masks, others, candidate_indices, self.n_patterns, candidate_rows)
+            others = others[np.argsort(-bound, kind="stable")[:self.HARD_POOL_SHORTLIST]]
+        return np.concatenate([guess_indices[is_candidate], np.sort(others)])
+    def _lookahead_pick(self, guess_indices, entropies, candidate_indices):
+        # Only the best one-ply guesses get the two-ply score, so the extra cost stays bounded
+        order = np.argsort(-entropies, kind="stable")
+        shortlist = guess_indices[order[:self.LOOKAHEAD_SHORTLIST]]
+        second_pool = guess_indices[order[:self.LOOKAHEAD_POOL]]
+        scores = lookahead_entropy(self.matrix, shortlist, candidate_indices, second_pool, self.n_patterns)
+        self.total_operations += len(shortlist) * len(second_pool) * len(candidate_indices)
+        return shortlist[int(np.argmax(scores))]
     def solve(self, board_state=None, hard_mode=True):
         self.start_time = time.time()
         self.solution_path = []
         self.expanded_nodes = 0
-        current_candidate_indices = np.arange(len(self.all_words))
+        self.pruned_guesses = 0
+        self.shortlist_cut = 0
+        self.bound_pruned = 0
+        self.sampled_turns = 0
+        self.index_bytes = 0
+        self.wide_index_bytes = 0
+        current_candidate_indices = index_range(len(self.answers))
+        # Hard mode: every word that keeps the revealed greens and yellows may be played
+        signatures = letter_signatures(self.all_words)
+        legal = np.ones(len(self.all_words), dtype=bool)
         if board_state:
             for guess_word, fb_chars in board_state:
                 if guess_word not in self.word_to_index: continue
-                
+                update_hard_mode_mask(legal, signatures, guess_word, fb_chars)
                 guess_idx = self.word_to_index[guess_word]
-                pattern_int = 0
-                for c in fb_chars:
-                    val = 2 if c == 'G' else (1 if c == 'Y' else 0)
-                    pattern_int = pattern_int * 3 + val
+                pattern_int = self._pattern_int(fb_chars)
                 patterns = self.matrix[guess_idx, current_candidate_indices]
+                self._count_indices(current_candidate_indices)
                 matches = (patterns == pattern_int)
                 current_candidate_indices = current_candidate_indices[matches]
                 self.solution_path.append(guess_word)
@@ -68,23 +194,41 @@ class EntropySolver:
                 best_guess = "SOARE"
             elif len(current_candidate_indices) <= 2:
                 idx = current_candidate_indices[0]
-                best_guess = self.all_words[idx]
+                best_guess = self.answers[idx]
             else:
-                if hard_mode:
-                    search_indices = current_candidate_indices
+                if not hard_mode:
+                    pool = index_range(len(self.all_words))
+                elif len(current_candidate_indices) > self.HARD_POOL_MIN_CANDIDATES:
+                    pool = np.flatnonzero(legal).astype(index_dtype(len(legal)))
                 else:
-                    search_indices = np.arange(len(self.all_words))
-                best_guess_idx = -1
-                max_entropy = -1.0
-                if len(search_indices) > 500:
-                    indices_to_check = np.random.choice(search_indices, 200, replace=False)
+                    pool = self.answer_rows[current_candidate_indices]
+                masks = letter_masks(self.all_words)
+                candidate_rows = self.answer_rows[current_candidate_indices]
+                search_indices = informative_guesses(masks, pool, current_candidate_indices, candidate_rows)
+                # Uninformative and equivalent guesses are pruned, the shortlist only cut
+                searched = len(search_indices)
+                if hard_mode and len(search_indices) > self.HARD_POOL_SHORTLIST:
+                    search_indices = self._hard_shortlist(masks, search_indices, current_candidate_indices)
+                    self.shortlist_cut += searched - len(search_indices)
+                self.pruned_guesses += len(pool) - searched
+                if len(current_candidate_indices) <= self.EQUIVALENCE_MAX_CANDIDATES:
+                    kept = len(search_indices)
+                    search_indices = distinct_guesses(self.matrix, search_indices, current_candidate_indices)
+                    self.pruned_guesses += kept - len(search_indices)
+                self._count_indices(search_indices, current_candidate_indices)
+                huge = len(current_candidate_indices) > self.SAMPLE_MIN_CANDIDATES
+                if self.lookahead:
+                    # One-ply scores only pick the shortlist, a candidate sample is enough for them
+                    scored_on = current_candidate_indices
+                    if huge:
+                        scored_on = np.random.choice(current_candidate_indices,
+                                                     min(self.SAMPLE_SIZE, len(current_candidate_indices)), replace=False)
+                    entropies = self._score_guesses(search_indices, scored_on)
+                    best_guess_idx = self._lookahead_pick(search_indices, entropies, current_candidate_indices)
+                elif huge and self._active_scorer(current_candidate_indices) == "entropy":
+                    best_guess_idx = self._estimate_best_guess(search_indices, current_candidate_indices)
                 else:
-                    indices_to_check = search_indices
-                for idx in indices_to_check:
-                    ent = self._calculate_entropy_vectorized(idx, current_candidate_indices)
-                    if ent > max_entropy:
-                        max_entropy = ent
-                        best_guess_idx = idx
+                    best_guess_idx = self._best_guess_bounded(search_indices, current_candidate_indices)
                 self.expanded_nodes += 1
                 best_guess = self.all_words[best_guess_idx]
 
@@ -92,12 +236,11 @@ class EntropySolver:
             if self.word_api.is_valid_guess(best_guess):
                 break
             real_fb_list = self.word_api.get_feedback(best_guess)
-            pattern_int = 0
-            for c in real_fb_list:
-                val = 2 if c == 'G' else (1 if c == 'Y' else 0)
-                pattern_int = pattern_int * 3 + val
+            update_hard_mode_mask(legal, signatures, best_guess, real_fb_list)
+            pattern_int = self._pattern_int(real_fb_list)
             guess_idx = self.word_to_index[best_guess]
             patterns = self.matrix[guess_idx, current_candidate_indices]
+            self._count_indices(current_candidate_indices)
             matches = (patterns == pattern_int)
             current_candidate_indices = current_candidate_indices[matches] 
             if len(current_candidate_indices) == 0:
@@ -128,5 +271,12 @@ class EntropySolver:
             "Expanded Nodes": self.expanded_nodes,
             "Total Guesses": len(self.solution_path),
             "Memory Usage": mem_str,
+            "Pruned Guesses": self.pruned_guesses,
+            "Shortlist Cut": self.shortlist_cut,
+            "Bound Pruned": self.bound_pruned,
+            "Sampled Turns": self.sampled_turns,
+            "Index Bytes": self.index_bytes,
+            "Index Bytes (int64)": self.wide_index_bytes,
+            "Row Cache Hit Rate": f"{self.matrix.hit_rate():.2%}" if hasattr(self.matrix, "hit_rate") else "N/A",
             "Status": "Win" if (self.solution_path and self.word_api.is_valid_guess(self.solution_path[-1])) else "Failed"
         }
\ No newline at end of file
@@ -0,0 +1,65 @@
+import numpy as np
+from Search_Algorithm.pattern_data import find_artifact
+
+N_PATTERNS = 243
+BOUNDS_FILE = "guess_bounds.npy"
+
+_cache_bounds = None
+
+
+def max_solvable(guesses, n_patterns=N_PATTERNS):
+    """Largest candidate set that can be solved within `guesses` guesses in the worst case.
+
+    One guess can win immediately and split the rest into at most n_patterns - 1
+    other buckets, so T(1) = 1 and T(k) = 1 + (n_patterns - 1) * T(k - 1).
+    """
+    total = 0
+    for _ in range(guesses):
+        total = 1 + (n_patterns - 1) * total
+    return total
+
+
+def lower_bound_guesses(n, n_patterns=N_PATTERNS):
+    """Admissible lower bound on the guesses needed to solve a set of n candidates."""
+    if n <= 0:
+        return 0
+    guesses, solvable = 1, 1
+    while solvable < n:
+        guesses += 1
+        solvable = 1 + (n_patterns - 1) * solvable
+    return guesses
+
+
+def load_bound_table(n_answers):
+    """Per-size bounds from precompute_bounds.py, indexed by set size.
+
+    None if not built, or built for another answer list (it must cover every
+    size up to n_answers).
+    """
+    global _cache_bounds
+    if _cache_bounds is None:
+        found = find_artifact(BOUNDS_FILE)
+        if found is None:
+            return None
+        _cache_bounds = np.load(found)
+    if len(_cache_bounds) != n_answers + 1:
+        return None
+    return _cache_bounds
+
+
+def table_bound(n, table, n_patterns=N_PATTERNS):
+    """Admissible lower bound on the guesses a set of n candidates needs, from the table when there is one.
+
+    The table bounds every set of its size over the whole guess list, so it is
+    never above the true cost and never below the analytic bound.
+    """
+    if table is None or n >= len(table):
+        return lower_bound_guesses(n, n_patterns)
+    return int(table[n])
+
+
+def table_solvable(guesses, table, n_patterns=N_PATTERNS):
+    """Largest set size table_bound() allows within `guesses` guesses."""
+    if table is None or table[-1] <= guesses:
+        return max_solvable(guesses, n_patterns)
+    return int(np.searchsorted(table, guesses, side="right")) - 1
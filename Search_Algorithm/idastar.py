@@ -0,0 +1,202 @@
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.astar import AStarSolver
+from Search_Algorithm.pattern_data import filter_indices
+from Search_Algorithm.scoring import batched_histograms, max_partitions
+from Search_Algorithm.transposition import TranspositionTable, candidate_fingerprint
+
+
+class IDAStarSolver(AStarSolver):
+    """Iterative-deepening search of the same AND-OR graph as AStarSolver.
+
+    Same moves and admissible heuristic, but each iteration is a depth-first
+    check that the set can be solved within a threshold of guesses, raised
+    to the smallest bound that went over it. Memory is one scratch row of
+    candidate indices and, per depth, the guesses that fit the threshold
+    instead of a search graph; histograms only live while one set is ranked.
+    Sets whose search finished are kept in a transposition table, as solved
+    within a threshold or as needing more than one, so later iterations and
+    turns do not expand them again.
+    """
+    MAX_PLAN_DEPTH = 12
+    MAX_ITERATIONS = 20
+    # Expansions per turn; sets settled by the transposition table are free
+    NODE_BUDGET = 100
+    # Two-guess checks per turn: each costs a few histograms, not a ranking of every move
+    TWO_GUESS_BUDGET = 5000
+    TT_MAX_ENTRIES = 100000
+
+    def __init__(self, api, memory_budget=None, lookahead=False, scorer="entropy", workers=1, matrix_free=False):
+        super().__init__(api, memory_budget=memory_budget, lookahead=lookahead, scorer=scorer,
+                         workers=workers, matrix_free=matrix_free)
+        self.iterations = 0
+        self.re_expansions = 0
+        self._scratch = None
+        self._held_bytes = []
+        self._expansions = 0
+        self._checks = 0
+        self._cutoffs = 0
+        self._previous_threshold = -1
+        self.tt = TranspositionTable(self.TT_MAX_ENTRIES)
+
+    def _histogram_bytes(self, n):
+        """Transient bytes of ranking one block of guesses over n candidates: gathered patterns and counts."""
+        return self.RANKED_SHORTLIST * (n + self.n_patterns) * np.dtype(np.intp).itemsize
+
+    def _exact_bounds(self, guesses, candidates):
+        """1 + heuristic(largest non-winning bucket) of each guess, 255 for one that keeps the whole set."""
+        counts = batched_histograms(self.table, guesses, candidates, self.workers, self.n_patterns)
+        counts[:, self.win_pid] = 0
+        worst = counts.max(axis=1)
+        bounds = 1 + self._size_bounds(worst)
+        bounds[worst == len(candidates)] = np.iinfo(np.uint8).max
+        return bounds
+
+    def _two_guess_move(self, candidates):
+        """A guess that leaves every other answer alone in its bucket, so the set fits in two guesses, or -1."""
+        n = len(candidates)
+        rows = self.answer_rows[candidates]
+        # n answers need n buckets: a candidate's own win bucket and n - 1 others, or n for any other guess
+        k = max_partitions(self.masks, self.all_guesses, candidates, self.n_patterns, rows)
+        pool = np.flatnonzero(k >= n)
+        # Candidates first, they may win at once
+        pool = pool[np.argsort(~np.isin(pool, rows), kind="stable")]
+        for start in range(0, len(pool), self.RANKED_SHORTLIST):
+            block = pool[start:start + self.RANKED_SHORTLIST]
+            counts = batched_histograms(self.table, block, candidates, self.workers, self.n_patterns)
+            counts[:, self.win_pid] = 0
+            fits = np.flatnonzero(counts.max(axis=1) <= 1)
+            if len(fits):
+                return int(block[fits[0]])
+        return -1
+
+    def _bounded_search(self, candidates, threshold, depth):
+        """Whether every answer in the set can be found within `threshold` more guesses.
+
+        Returns (first guess, next threshold). The guess is -1 when no plan fits;
+        the next threshold is then the smallest worst case that went over it.
+        """
+        n = len(candidates)
+        if n <= 2:
+            return (int(self.answer_rows[candidates[0]]) if n <= threshold else -1), n
+        bound = self.heuristic(n)
+        if bound > threshold:
+            return -1, bound
+        fingerprint = candidate_fingerprint(candidates, self._fp_keys)
+        entry = self.tt.probe(fingerprint, threshold)
+        if entry is not None:
+            flag, remaining, suffix = entry
+            return (suffix[0], threshold) if flag == TranspositionTable.SOLVED else (-1, remaining + 1)
+        if threshold == 2 and self._checks < self.TWO_GUESS_BUDGET:
+            # Two guesses are a direct check, not an expansion
+            self._checks += 1
+            guess_idx = self._two_guess_move(candidates)
+            if guess_idx < 0:
+                self.tt.store_failure(fingerprint, threshold)
+                return -1, threshold + 1
+            self.tt.store_solution(fingerprint, [guess_idx], threshold)
+            return guess_idx, threshold
+        if depth >= self.MAX_PLAN_DEPTH or self._expansions >= self.NODE_BUDGET or threshold == 2:
+            # Cut off, not refuted: nothing below may be stored as proven
+            self._cutoffs += 1
+            return -1, float("inf")
+        cutoffs = self._cutoffs
+
+        self.expanded_nodes += 1
+        self._expansions += 1
+        # Sets within the previous threshold were already expanded last iteration
+        if bound <= self._previous_threshold - depth:
+            self.re_expansions += 1
+
+        moves, move_lbs = self._ranked_moves(candidates)
+        # Ranked and unranked moves are sorted apart: moves over the threshold are skipped, not a cut-off
+        fits = move_lbs <= threshold
+        next_threshold = int(move_lbs[~fits].min()) if not fits.all() else float("inf")
+        ranked = int(np.count_nonzero(fits[:self.RANKED_SHORTLIST]))
+        # Only the guess indices that fit stay on this level while the children are searched
+        moves = moves[fits]
+        del move_lbs, fits
+        self._held_bytes[depth] = moves.nbytes
+        self.peak_search_bytes = max(self.peak_search_bytes, self._scratch.nbytes + self._histogram_bytes(n)
+                                     + sum(self._held_bytes[:depth + 1]))
+        blocks = [slice(0, ranked)] + [slice(start, start + self.RANKED_SHORTLIST)
+                                       for start in range(ranked, len(moves), self.RANKED_SHORTLIST)]
+        for block in blocks:
+            block_moves = moves[block]
+            if block.start:
+                # Unranked moves only have letter-mask bounds: bound a block at a time, once the ranked ones failed
+                block_lbs = self._exact_bounds(block_moves, candidates)
+                over = block_lbs > threshold
+                if over.any():
+                    next_threshold = min(next_threshold, int(block_lbs[over].min()))
+                block_moves = block_moves[~over]
+            for guess_idx in block_moves:
+                patterns = self.table[guess_idx, candidates]
+                pids, sizes = np.unique(patterns, return_counts=True)
+                # Unranked moves may still trail the ranked ones: check the exact bound the row gives
+                worst = sizes[pids != self.win_pid].max(initial=0)
+                exact_lb = 1 + self.heuristic(worst) if worst < n else float("inf")
+                if exact_lb > threshold:
+                    next_threshold = min(next_threshold, exact_lb)
+                    continue
+                # Largest bucket first: it is the likeliest to break the threshold
+                needed = 0
+                for pid in pids[np.argsort(-sizes, kind="stable")]:
+                    if pid == self.win_pid:
+                        continue
+                    child = filter_indices(self.table, guess_idx, candidates, pid, out=self._scratch[depth + 1])
+                    first, child_threshold = self._bounded_search(child, threshold - 1, depth + 1)
+                    if first < 0:
+                        needed = max(exact_lb, 1 + child_threshold)
+                        break
+                if needed == 0:
+                    self.tt.store_solution(fingerprint, [int(guess_idx)], threshold)
+                    return int(guess_idx), threshold
+                next_threshold = min(next_threshold, needed)
+        if self._cutoffs == cutoffs and next_threshold != float("inf"):
+            # Every move was refuted: the set needs at least next_threshold guesses
+            self.tt.store_failure(fingerprint, next_threshold - 1)
+        return -1, next_threshold
+
+    def _plan_guess(self, candidates):
+        self._scratch = np.empty((self.MAX_PLAN_DEPTH + 1, len(candidates)), dtype=candidates.dtype)
+        self._held_bytes = [0] * (self.MAX_PLAN_DEPTH + 1)
+        self._expansions = 0
+        self._checks = 0
+        self._previous_threshold = -1
+        threshold = self.heuristic(len(candidates))
+
+        for _ in range(self.MAX_ITERATIONS):
+            self.iterations += 1
+            first_guess, next_threshold = self._bounded_search(candidates, threshold, 0)
+            if first_guess >= 0:
+                # Every smaller threshold was refuted, so this worst case is minimal
+                self.plan_costs.append(threshold)
+                self.proven_turns += 1
+                return first_guess
+            if (next_threshold == float("inf") or self._expansions >= self.NODE_BUDGET
+                    or self._checks >= self.TWO_GUESS_BUDGET):
+                break
+            self._previous_threshold = threshold
+            threshold = next_threshold
+
+        # No plan within the budget: take the move with the best bound
+        self.plan_costs.append(None)
+        moves, _ = self._ranked_moves(candidates)
+        return int(moves[0])
+
+    def solve(self, board_state=None, max_turns=None):
+        self.iterations = 0
+        self.re_expansions = 0
+        self.tt.clear()
+        return super().solve(board_state, max_turns)
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats["Iterations"] = self.iterations
+        stats["Re-expansions"] = self.re_expansions
+        stats["TT Hit Rate"] = f"{self.tt.hit_rate():.2%} ({self.tt.hits}/{self.tt.probes})"
+        return stats
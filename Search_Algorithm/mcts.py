@@ -0,0 +1,379 @@
+import atexit
+import os
+import sys
+import time
+import numpy as np
+from multiprocessing import Pool, cpu_count
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import (answer_axis, share_table, attach_table, feedback_to_pid, win_pid,
+                                           pattern_histograms, entropy_from_counts, filter_indices, index_range)
+from Search_Algorithm.pattern_rows import load_pattern_data
+
+worker_search = None
+worker_shm = None
+
+
+class _SearchTree:
+    """MCTS tree stored in flat, growable arrays.
+
+    Decision node i owns the child slots [child_start[i], child_start[i] + child_count[i]);
+    each slot is one guess with its visit count and summed cost. The node reached
+    after a slot and a feedback pattern is looked up in `outcomes`.
+    """
+
+    def __init__(self, capacity=1024):
+        self.n_nodes = 0
+        self.n_slots = 0
+        self.child_start = np.zeros(capacity, dtype=np.int32)
+        self.child_count = np.zeros(capacity, dtype=np.int16)
+        self.expanded = np.zeros(capacity, dtype=bool)
+        self.node_visits = np.zeros(capacity, dtype=np.int32)
+        self.slot_guess = np.zeros(capacity, dtype=np.int32)
+        self.slot_visits = np.zeros(capacity, dtype=np.int32)
+        self.slot_cost = np.zeros(capacity, dtype=np.float64)
+        self.outcomes = {}
+
+    @staticmethod
+    def _grow(array, size):
+        if size <= len(array):
+            return array
+        grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def new_node(self):
+        node = self.n_nodes
+        self.n_nodes += 1
+        self.child_start = self._grow(self.child_start, self.n_nodes)
+        self.child_count = self._grow(self.child_count, self.n_nodes)
+        self.expanded = self._grow(self.expanded, self.n_nodes)
+        self.node_visits = self._grow(self.node_visits, self.n_nodes)
+        return node
+
+    def add_children(self, node, guesses):
+        start = self.n_slots
+        self.n_slots += len(guesses)
+        self.slot_guess = self._grow(self.slot_guess, self.n_slots)
+        self.slot_visits = self._grow(self.slot_visits, self.n_slots)
+        self.slot_cost = self._grow(self.slot_cost, self.n_slots)
+        self.slot_guess[start:self.n_slots] = guesses
+        self.child_start[node] = start
+        self.child_count[node] = len(guesses)
+        self.expanded[node] = True
+
+    def nbytes(self):
+        arrays = (self.child_start, self.child_count, self.expanded, self.node_visits,
+                  self.slot_guess, self.slot_visits, self.slot_cost)
+        return sum(a.nbytes for a in arrays) + sys.getsizeof(self.outcomes)
+
+
+class _MonteCarloSearch:
+    """UCT over guesses with sampled targets.
+
+    Every iteration draws a target from the root candidates, walks the tree
+    (the target fixes each feedback), adds one node and finishes the game with
+    the rollout policy: guess the remaining candidate with the best static
+    entropy. The cost of an iteration is the number of guesses it took.
+    Nodes choose among candidates; the root of a small set also gets the
+    non-candidate guesses that split it best, which a family of look-alike
+    answers needs.
+    """
+    # Guesses per block when every guess is scored against the root set
+    PROBE_BLOCK = 1024
+
+    def __init__(self, table, static_entropy, win, moves_per_node, pool_limit, exploration, answer_rows, seed=None):
+        self.table = table
+        self.static_entropy = static_entropy
+        self.answer_rows = answer_rows
+        self.win = win
+        self.moves_per_node = moves_per_node
+        self.pool_limit = pool_limit
+        self.exploration = exploration
+        self.rng = np.random.default_rng(seed)
+        self.all_guesses = index_range(table.shape[0])
+        self.probes = 0
+        self.tree = None
+        self.iterations = 0
+
+    def reset(self):
+        self.tree = _SearchTree()
+        self.tree.new_node()
+        self.iterations = 0
+
+    def _expand(self, node, candidates):
+        pool = self.answer_rows[candidates]
+        if len(pool) > self.pool_limit:
+            pool = pool[np.argsort(-self.static_entropy[pool], kind="stable")[:self.pool_limit]]
+        entropy = entropy_from_counts(pattern_histograms(self.table, pool, candidates, self.win + 1))
+        moves = pool[np.argsort(-entropy, kind="stable")[:self.moves_per_node]]
+        if node == 0 and self.probes:
+            moves = np.concatenate([moves, self._probe_guesses(candidates)])
+        self.tree.add_children(node, moves)
+
+    def _probe_guesses(self, candidates):
+        """The `probes` non-candidate guesses with the highest entropy over the set."""
+        entropy = np.empty(len(self.all_guesses))
+        for start in range(0, len(self.all_guesses), self.PROBE_BLOCK):
+            block = self.all_guesses[start:start + self.PROBE_BLOCK]
+            entropy[block] = entropy_from_counts(pattern_histograms(self.table, block, candidates, self.win + 1))
+        entropy[self.answer_rows[candidates]] = -np.inf
+        return np.argsort(-entropy, kind="stable")[:self.probes]
+
+    def _select(self, node):
+        tree = self.tree
+        start = tree.child_start[node]
+        slots = np.arange(start, start + tree.child_count[node])
+        visits = tree.slot_visits[slots]
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return int(slots[unvisited[0]])
+        # Costs are guesses, so the lower confidence bound is minimised
+        mean = tree.slot_cost[slots] / visits
+        bonus = self.exploration * np.sqrt(np.log(tree.node_visits[node]) / visits)
+        return int(slots[np.argmin(mean - bonus)])
+
+    def _rollout(self, candidates, target):
+        guesses = 0
+        while True:
+            guesses += 1
+            rows = self.answer_rows[candidates]
+            guess_idx = int(rows[np.argmax(self.static_entropy[rows])])
+            pid = self.table[guess_idx, target]
+            if pid == self.win:
+                return guesses
+            candidates = filter_indices(self.table, guess_idx, candidates, pid)
+
+    def iterate(self, root_candidates):
+        tree = self.tree
+        target = int(root_candidates[self.rng.integers(len(root_candidates))])
+        node, candidates, path, cost = 0, root_candidates, [], 0
+        while True:
+            if len(candidates) == 1:
+                cost += 1
+                break
+            if not tree.expanded[node]:
+                self._expand(node, candidates)
+            slot = self._select(node)
+            path.append((node, slot))
+            cost += 1
+            guess_idx = int(tree.slot_guess[slot])
+            pid = int(self.table[guess_idx, target])
+            if pid == self.win:
+                break
+            candidates = filter_indices(self.table, guess_idx, candidates, pid)
+            child = tree.outcomes.get((slot, pid))
+            if child is None:
+                tree.outcomes[(slot, pid)] = tree.new_node()
+                cost += self._rollout(candidates, target)
+                break
+            node = child
+        for depth, (node, slot) in enumerate(path):
+            tree.node_visits[node] += 1
+            tree.slot_visits[slot] += 1
+            tree.slot_cost[slot] += cost - depth
+        self.iterations += 1
+
+    def run(self, root_candidates, deadline, probes=0):
+        self.reset()
+        self.probes = probes
+        # Anytime: keep iterating until the deadline, at least once
+        while True:
+            self.iterate(root_candidates)
+            if time.perf_counter() >= deadline:
+                break
+        tree = self.tree
+        slots = np.arange(tree.child_start[0], tree.child_start[0] + tree.child_count[0])
+        return tree.slot_guess[slots].copy(), tree.slot_visits[slots].copy(), tree.slot_cost[slots].copy()
+
+
+def init_rollout_worker(table_descriptor, static_entropy, win, moves_per_node, pool_limit, exploration, answer_rows):
+    global worker_search, worker_shm
+    worker_shm, table = attach_table(table_descriptor)
+    worker_search = _MonteCarloSearch(table, static_entropy, win, moves_per_node, pool_limit, exploration,
+                                      answer_rows)
+
+
+def search_root(args):
+    candidates, budget_seconds, seed, probes = args
+    worker_search.rng = np.random.default_rng(seed)
+    guesses, visits, costs = worker_search.run(candidates, time.perf_counter() + budget_seconds, probes)
+    return guesses, visits, costs, worker_search.iterations, worker_search.tree.n_nodes, worker_search.tree.nbytes()
+
+
+class MCTSSolver:
+    """Anytime Monte Carlo tree search: each turn runs UCT iterations until the
+    millisecond budget expires, then plays the most visited guess. The last
+    turn of a bounded game plays a candidate, the only guess that can win."""
+    OPENING_WORD = "SALET"
+    TIME_BUDGET_MS = 500
+    MOVES_PER_NODE = 12
+    GUESS_POOL_LIMIT = 300
+    EXPLORATION = 1.0
+    PARALLEL_MIN_CANDIDATES = 50
+    # Non-candidate guesses at the root of sets up to PROBE_MAX_CANDIDATES, which
+    # candidates alike in all but a letter or two would take one at a time
+    PROBE_SHORTLIST = 4
+    PROBE_MAX_CANDIDATES = 100
+
+    # Rollout pool, kept across turns and solves for the same table and worker count
+    _pool = None
+    _pool_key = None
+
+    def __init__(self, api, time_budget_ms=None, workers=None, seed=None, matrix_free=False):
+        self.api = api
+        self.target = getattr(api, 'word', None)
+        if self.target: self.target = self.target.upper()
+
+        # Without static_entropy.pkl the table is a stored artifact or computed on demand, as in A*
+        self.data = load_pattern_data(getattr(api, "words_list", None), getattr(api, "answers_list", None),
+                                      matrix_free)
+        if self.data is None:
+            raise FileNotFoundError("Thiếu static_entropy.pkl")
+        self.full_dictionary = self.data["full_dictionary"]
+        self.table = self.data["pattern_table"]
+        self.w2i = self.data["word_to_idx"]
+        self.answers, self.answer_rows, self.a2i = answer_axis(self.data)
+        if "static_entropy" in self.data:
+            self.static_entropy = self.data["static_entropy"]
+        else:
+            entropy_map = self.data["entropy_map"]
+            self.static_entropy = np.array([entropy_map.get(w, 0.0) for w in self.full_dictionary])
+        self.win = win_pid(len(self.full_dictionary[0]))
+        self.time_budget_ms = time_budget_ms or self.TIME_BUDGET_MS
+        # Only a dense table can be shared with worker processes
+        self.workers = cpu_count() if workers == 0 else (workers or 1)
+        if not isinstance(self.table, np.ndarray):
+            self.workers = 1
+        self.seed = seed
+        self.search = _MonteCarloSearch(self.table, self.static_entropy, self.win, self.MOVES_PER_NODE,
+                                        self.GUESS_POOL_LIMIT, self.EXPLORATION, self.answer_rows, seed)
+
+        self.guesses_history = []
+        self.search_time = 0
+        self.expanded_nodes = 0
+        self.rollouts = 0
+        self.memory_usage = 0
+        self.peak_tree_bytes = 0
+        self.candidates_indices = index_range(len(self.answers))
+
+    def _root_pool(self):
+        """The rollout pool for this table and worker count, started on first use."""
+        key = (id(self.table), self.workers, self.MOVES_PER_NODE, self.GUESS_POOL_LIMIT, self.EXPLORATION)
+        if MCTSSolver._pool_key != key:
+            _close_root_pool()
+            initargs = (share_table(self.table), self.static_entropy, self.win, self.MOVES_PER_NODE,
+                        self.GUESS_POOL_LIMIT, self.EXPLORATION, self.answer_rows)
+            MCTSSolver._pool = Pool(processes=self.workers, initializer=init_rollout_worker, initargs=initargs)
+            MCTSSolver._pool_key = key
+        return MCTSSolver._pool
+
+    def _best_guess(self, candidates, pool):
+        budget_seconds = self.time_budget_ms / 1000.0
+        probes = self.PROBE_SHORTLIST if len(candidates) <= self.PROBE_MAX_CANDIDATES else 0
+        if pool is not None:
+            # Root parallelisation: independent trees, root statistics merged by guess
+            seeds = np.random.SeedSequence(self.seed).spawn(self.workers)
+            results = pool.map(search_root, [(candidates, budget_seconds, s, probes) for s in seeds])
+            visits, costs = {}, {}
+            for guesses, slot_visits, slot_costs, iterations, nodes, nbytes in results:
+                self.rollouts += iterations
+                self.expanded_nodes += nodes
+                self.peak_tree_bytes = max(self.peak_tree_bytes, nbytes)
+                for g, v, c in zip(guesses.tolist(), slot_visits.tolist(), slot_costs.tolist()):
+                    visits[g] = visits.get(g, 0) + v
+                    costs[g] = costs.get(g, 0.0) + c
+            return max(visits, key=lambda g: (visits[g], -costs[g] / max(visits[g], 1)))
+
+        guesses, visits, costs = self.search.run(candidates, time.perf_counter() + budget_seconds, probes)
+        self.rollouts += self.search.iterations
+        self.expanded_nodes += self.search.tree.n_nodes
+        self.peak_tree_bytes = max(self.peak_tree_bytes, self.search.tree.nbytes())
+        best = np.lexsort((costs / np.maximum(visits, 1), -visits))[0]
+        return int(guesses[best])
+
+    def solve(self, board_state=None, max_turns=None):
+        start_time = time.time()
+        self.guesses_history = []
+        self.expanded_nodes = 0
+        self.rollouts = 0
+        self.peak_tree_bytes = 0
+        self.candidates_indices = index_range(len(self.answers))
+
+        if board_state:
+            for guess, feedback_chars in board_state:
+                guess = guess.upper()
+                if guess not in self.w2i: continue
+                row = self.table[self.w2i[guess], self.candidates_indices]
+                self.candidates_indices = self.candidates_indices[row == feedback_to_pid(feedback_chars)]
+
+        pool = self._root_pool() if self.workers > 1 else None
+        current_turn = len(board_state) if board_state else 0
+        while True:
+            if max_turns is not None and current_turn >= max_turns:
+                break
+            current_turn += 1
+            if current_turn == 1:
+                best_word = self.OPENING_WORD
+            elif len(self.candidates_indices) <= 2:
+                best_word = self.answers[self.candidates_indices[0]]
+            elif current_turn == max_turns:
+                # A probe cannot win on the last turn: play the rollout policy's candidate
+                rows = self.answer_rows[self.candidates_indices]
+                best_word = self.full_dictionary[rows[np.argmax(self.static_entropy[rows])]]
+            else:
+                use_pool = pool if len(self.candidates_indices) >= self.PARALLEL_MIN_CANDIDATES else None
+                best_word = self.full_dictionary[self._best_guess(self.candidates_indices, use_pool)]
+
+            self.guesses_history.append(best_word)
+            if not self.target or best_word == self.target: break
+
+            g_idx = self.w2i[best_word]
+            real_pid = self.table[g_idx, self.a2i[self.target]]
+            row = self.table[g_idx, self.candidates_indices]
+            self.candidates_indices = self.candidates_indices[row == real_pid]
+            if len(self.candidates_indices) == 0: break
+
+        self.search_time = time.time() - start_time
+        mem_history = sys.getsizeof(self.guesses_history) + sum(sys.getsizeof(w) for w in self.guesses_history)
+        self.memory_usage = self.candidates_indices.nbytes + mem_history + self.peak_tree_bytes
+        return self.guesses_history
+
+    def _calculate_feedback(self, guess, secret):
+        feedback = [''] * 5
+        s_list = list(secret); g_list = list(guess)
+        for i in range(5):
+            if g_list[i] == s_list[i]: feedback[i] = 'G'; s_list[i] = '#'; g_list[i] = '$'
+        for i in range(5):
+            if g_list[i] == '$': continue
+            if g_list[i] in s_list: feedback[i] = 'Y'; s_list[s_list.index(g_list[i])] = '#'
+            else: feedback[i] = 'X'
+        return tuple([f if f else 'X' for f in feedback])
+
+    def get_stats(self):
+        # Format memory intelligently
+        if self.memory_usage < 1024:
+            mem_str = f"{self.memory_usage} bytes"
+        elif self.memory_usage < 1024 * 1024:
+            mem_str = f"{self.memory_usage / 1024:.2f} KB"
+        else:
+            mem_str = f"{self.memory_usage / (1024 * 1024):.2f} MB"
+
+        return {
+            "Time": f"{self.search_time:.4f}s",
+            "Expanded Nodes": self.expanded_nodes,
+            "Total Guesses": len(self.guesses_history),
+            "Memory Usage": mem_str,
+            "Rollouts": self.rollouts,
+            "Time Budget": f"{self.time_budget_ms} ms/turn",
+            "Status": "Win" if self.guesses_history and self.guesses_history[-1] == self.target else "Failed"
+        }
+
+
+@atexit.register
+def _close_root_pool():
+    if MCTSSolver._pool is not None:
+        MCTSSolver._pool.terminate()
+        MCTSSolver._pool.join()
+    MCTSSolver._pool = None
+    MCTSSolver._pool_key = None
@@ -0,0 +1,394 @@
+import os
+import sys
+import time
+import atexit
+import numpy as np
+from multiprocessing import Pool, Value, cpu_count
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import (answer_axis, share_table, attach_table, feedback_to_pid, win_pid,
+                                           index_range, letter_masks, distinct_guesses)
+from Search_Algorithm.pattern_rows import load_pattern_data
+from Search_Algorithm.heuristics import load_bound_table, table_bound, table_solvable
+from Search_Algorithm.scoring import max_partitions
+from Search_Algorithm.transposition import TranspositionTable, zobrist_keys, candidate_fingerprint
+
+# Root workers: each process runs its own search engine on the shared pattern table,
+# in a pool kept across turns; the incumbent and the nodes spent this turn are shared
+worker_search = None
+worker_shm = None
+worker_best = None
+# Cells per block when ranking the pool, bounds the [guesses x candidates] temporaries
+RANK_CELLS = 1 << 20
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class _MinimaxSearch:
+    """Depth-bounded minimax over the adversary's pattern choices.
+
+    solve_set(S, r) returns (value, guess) where value is the worst-case number
+    of guesses needed for S, or (None, -1) if S cannot be guaranteed within r.
+    Every allowed guess is a move. Guesses are tried smallest worst bucket
+    first, and every later guess only has to beat the incumbent (alpha-beta on
+    the worst bucket). A guess is cut as soon as one of its buckets cannot be
+    solved within the remaining bound. Candidates are answer (column) indices,
+    guesses are rows: answer_rows maps a candidate to its own row.
+    """
+
+    def __init__(self, table, win, masks, node_budget, tt_entries, answer_rows, bound_table=None, shared_nodes=None):
+        self.table = table
+        self.answer_rows = answer_rows
+        self.win = win
+        self.masks = masks
+        self.bound_table = bound_table
+        self.all_guesses = index_range(table.shape[0])
+        self.node_budget = node_budget
+        self.keys = zobrist_keys(table.shape[1])
+        self.tt = TranspositionTable(tt_entries)
+        # In a root worker the budget is spent by all root tasks of the turn together
+        self.shared_nodes = shared_nodes
+        self.nodes = 0
+        self.cutoffs = 0
+
+    def lower_bound(self, n):
+        return table_bound(n, self.bound_table, self.win + 1)
+
+    def split_stats(self, guesses, candidates):
+        """(worst non-winning bucket, number of buckets) of every guess over the set.
+
+        Cost grows with |guesses| x |set|, not with the number of patterns: the
+        rows are sorted, so each bucket is one run of equal ids.
+        """
+        worst = np.zeros(len(guesses), dtype=np.int64)
+        buckets = np.zeros(len(guesses), dtype=np.int64)
+        n_patterns = self.win + 1
+        step = max(1, RANK_CELLS // len(candidates))
+        for start in range(0, len(guesses), step):
+            block = guesses[start:start + step]
+            keys = self.table[np.ix_(block, candidates)].astype(np.int64)
+            keys += np.arange(len(block), dtype=np.int64)[:, None] * n_patterns
+            keys.sort(axis=1)
+            keys = keys.ravel()
+            firsts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            sizes = np.diff(np.r_[firsts, len(keys)])
+            owner, pid = np.divmod(keys[firsts], n_patterns)
+            buckets[start:start + len(block)] = np.bincount(owner, minlength=len(block))
+            sizes[pid == self.win] = 0
+            np.maximum.at(worst[start:start + len(block)], owner, sizes)
+        return worst, buckets
+
+    def ranked_guesses(self, candidates, bound=None):
+        """(guess, worst bucket) of every useful guess, smallest worst bucket first.
+
+        Only guesses that cannot reach the bound are dropped, so the ranking
+        still covers the whole pool: letter masks first (no information, or too
+        few possible buckets for the set), then the measured worst bucket, then
+        one guess per class of identical rows over the set.
+        """
+        n = len(candidates)
+        rows = self.answer_rows[candidates]
+        # Past this size a bucket cannot be solved within the bound
+        limit = n - 1 if bound is None else min(n - 1, table_solvable(bound - 1, self.bound_table, self.win + 1))
+        # At most k buckets hold the n - 1 candidates the guess does not win on; k = 1 carries no information
+        k = max_partitions(self.masks, self.all_guesses, candidates, self.win + 1, candidate_rows=rows)
+        pool = self.all_guesses[(k > 1) & (-(-(n - 1) // k) <= limit)]
+        worst, buckets = self.split_stats(pool, candidates)
+        keep = worst <= limit
+        pool, worst, buckets = pool[keep], worst[keep], buckets[keep]
+        # Guesses with the same row over the set split it the same way
+        distinct = np.isin(pool, distinct_guesses(self.table, pool, candidates))
+        pool, worst, buckets = pool[distinct], worst[distinct], buckets[distinct]
+        # Between equal worst buckets, more buckets leave smaller sets behind
+        order = np.lexsort((-buckets, worst))
+        return [(int(pool[i]), int(worst[i])) for i in order]
+
+    def evaluate_guess(self, candidates, guess_idx, bound):
+        """Worst-case value of playing guess_idx on the set, or None if it exceeds bound."""
+        patterns = self.table[guess_idx, candidates]
+        pids, inverse, sizes = np.unique(patterns, return_inverse=True, return_counts=True)
+        worst = 1
+        # Largest bucket first: it is the one most likely to break the bound
+        for b in np.argsort(-sizes, kind="stable"):
+            if pids[b] == self.win:
+                continue
+            if 1 + self.lower_bound(int(sizes[b])) > bound:
+                self.cutoffs += 1
+                return None
+            value, _ = self.solve_set(candidates[inverse == b], bound - 1)
+            if value is None:
+                self.cutoffs += 1
+                return None
+            worst = max(worst, 1 + value)
+        return worst
+
+    def _spend_node(self):
+        self.nodes += 1
+        spent = self.nodes
+        if self.shared_nodes is not None:
+            with self.shared_nodes.get_lock():
+                self.shared_nodes.value += 1
+                spent = self.shared_nodes.value
+        if spent > self.node_budget:
+            raise _BudgetExceeded()
+
+    def solve_set(self, candidates, bound):
+        n = len(candidates)
+        if n == 1:
+            return (1, int(self.answer_rows[candidates[0]])) if bound >= 1 else (None, -1)
+        if self.lower_bound(n) > bound:
+            return None, -1
+        fingerprint = candidate_fingerprint(candidates, self.keys)
+        entry = self.tt.probe(fingerprint, bound)
+        if entry is not None:
+            flag, depth, payload = entry
+            return (depth, payload[0]) if flag == TranspositionTable.SOLVED else (None, -1)
+        known = self.tt.entries.get(fingerprint)
+        if known is not None and known[0] == TranspositionTable.SOLVED:
+            # Exact value already known and it is above this bound
+            return None, -1
+
+        self._spend_node()
+        best_value, best_guess = None, -1
+        for guess_idx, worst in self.ranked_guesses(candidates, bound):
+            limit = bound if best_value is None else best_value - 1
+            # Sorted by worst bucket, so no later guess fits the limit either
+            if 1 + self.lower_bound(worst) > limit:
+                break
+            value = self.evaluate_guess(candidates, guess_idx, limit)
+            if value is not None:
+                best_value, best_guess = value, guess_idx
+                if best_value <= self.lower_bound(n):
+                    break
+        if best_value is None:
+            self.tt.store_failure(fingerprint, bound)
+        else:
+            self.tt.store_solution(fingerprint, [best_guess], depth=best_value)
+        return best_value, best_guess
+
+
+def init_root_worker(table_descriptor, win, masks, node_budget, tt_entries, answer_rows, bound_table, best_value,
+                     shared_nodes):
+    global worker_search, worker_shm, worker_best
+    worker_shm, table = attach_table(table_descriptor)
+    worker_search = _MinimaxSearch(table, win, masks, node_budget, tt_entries, answer_rows, bound_table, shared_nodes)
+    worker_best = best_value
+
+
+def evaluate_root_guess(args):
+    """(guess, value, nodes, cutoffs, complete) of one root guess.
+
+    value is None when the guess cannot match the incumbent; complete is False
+    when the turn's node budget ran out first, so nothing was proven.
+    """
+    candidates, guess_idx, bound = args
+    search = worker_search
+    search.nodes = 0
+    search.cutoffs = 0
+    if search.shared_nodes.value >= search.node_budget:
+        return guess_idx, None, 0, 0, False
+    # Shared incumbent: a guess only has to match the best value any worker has
+    # found, so every guess tied with the best one is still evaluated
+    with worker_best.get_lock():
+        bound = min(bound, worker_best.value)
+    try:
+        value = search.evaluate_guess(candidates, guess_idx, bound)
+    except _BudgetExceeded:
+        return guess_idx, None, search.nodes, search.cutoffs, False
+    if value is not None:
+        with worker_best.get_lock():
+            worker_best.value = min(worker_best.value, value)
+    return guess_idx, value, search.nodes, search.cutoffs, True
+
+
+class MinimaxSolver:
+    """Worst-case optimal solver: each turn plays the guess that guarantees the
+    fewest remaining guesses against any feedback, within MAX_GUESSES total."""
+    OPENING_WORD = "SALET"
+    MAX_GUESSES = 6
+    # Search budget per turn; past it the turn falls back to the smallest worst bucket
+    NODE_BUDGET = 20000
+    TT_MAX_ENTRIES = 200000
+    PARALLEL_MIN_CANDIDATES = 150
+
+    # Root pool and its shared values, kept across turns and solves for the same
+    # table and worker count
+    _pool = None
+    _pool_key = None
+    _pool_best = None
+    _pool_nodes = None
+
+    def __init__(self, api, workers=None, matrix_free=False):
+        self.api = api
+        self.target = getattr(api, 'word', None)
+        if self.target: self.target = self.target.upper()
+
+        # Without static_entropy.pkl the table is a stored artifact or computed on demand, as in A*
+        self.data = load_pattern_data(api.words_list, getattr(api, "answers_list", None), matrix_free)
+        if self.data is None:
+            raise FileNotFoundError("Thiếu static_entropy.pkl")
+        self.full_dictionary = self.data["full_dictionary"]
+        self.table = self.data["pattern_table"]
+        self.w2i = self.data["word_to_idx"]
+        self.answers, self.answer_rows, self.a2i = answer_axis(self.data)
+        self.win = win_pid(len(self.full_dictionary[0]))
+        # More workers than cores would only time-slice the root guesses; only a
+        # dense table can be shared with worker processes
+        self.workers = min(cpu_count() if workers == 0 else (workers or 1), os.cpu_count() or 1)
+        if not isinstance(self.table, np.ndarray):
+            self.workers = 1
+        self.masks = letter_masks(self.full_dictionary)
+        self.bound_table = load_bound_table(len(self.answers))
+        self.search = _MinimaxSearch(self.table, self.win, self.masks, self.NODE_BUDGET, self.TT_MAX_ENTRIES,
+                                     self.answer_rows, self.bound_table)
+
+        self.guesses_history = []
+        self.search_time = 0
+        self.expanded_nodes = 0
+        self.memory_usage = 0
+        self.guarantee = None
+        self.worker_cutoffs = 0
+        self.candidates_indices = index_range(len(self.answers))
+
+    def _root_pool(self):
+        """The root pool for this table and worker count, started on first use."""
+        key = (id(self.table), self.workers, self.NODE_BUDGET)
+        if MinimaxSolver._pool_key != key:
+            _close_root_pool()
+            MinimaxSolver._pool_best = Value('i', 0)
+            MinimaxSolver._pool_nodes = Value('q', 0)
+            initargs = (share_table(self.table), self.win, self.masks, self.NODE_BUDGET, self.TT_MAX_ENTRIES,
+                        self.answer_rows, self.bound_table, MinimaxSolver._pool_best, MinimaxSolver._pool_nodes)
+            MinimaxSolver._pool = Pool(processes=self.workers, initializer=init_root_worker, initargs=initargs)
+            MinimaxSolver._pool_key = key
+        return MinimaxSolver._pool
+
+    def _best_guess_parallel(self, candidates, bound):
+        """Root guesses split over the pool under one node budget for the turn.
+
+        The result is a guarantee only when no root guess was cut by the budget;
+        otherwise the turn returns (None, -1) like the serial search.
+        """
+        pool = self._root_pool()
+        MinimaxSolver._pool_best.value = bound
+        MinimaxSolver._pool_nodes.value = 0
+        tasks = [(candidates, guess_idx, bound) for guess_idx, _ in self.search.ranked_guesses(candidates, bound)]
+        results = {}
+        complete = True
+        for guess_idx, value, nodes, cutoffs, finished in pool.imap_unordered(evaluate_root_guess, tasks):
+            self.expanded_nodes += nodes
+            self.worker_cutoffs += cutoffs
+            complete &= finished
+            if value is not None:
+                results[guess_idx] = value
+        if not complete or not results:
+            return None, -1
+        # Workers keep every guess that ties the best value, so reducing in rank
+        # order gives the guess the serial search picks: the first ranked of the best
+        rank = {task[1]: i for i, task in enumerate(tasks)}
+        best_guess = min(results, key=lambda g: (results[g], rank[g]))
+        return results[best_guess], best_guess
+
+    def _best_guess(self, candidates, bound):
+        if self.workers > 1 and len(candidates) >= self.PARALLEL_MIN_CANDIDATES:
+            return self._best_guess_parallel(candidates, bound)
+        self.search.nodes = 0
+        try:
+            value, guess_idx = self.search.solve_set(candidates, bound)
+        except _BudgetExceeded:
+            value, guess_idx = None, -1
+        self.expanded_nodes += self.search.nodes
+        return value, guess_idx
+
+    def solve(self, board_state=None, max_turns=None):
+        start_time = time.time()
+        self.guesses_history = []
+        self.expanded_nodes = 0
+        self.guarantee = None
+        self.search.tt.clear()
+        self.search.cutoffs = 0
+        self.worker_cutoffs = 0
+        self.candidates_indices = index_range(len(self.answers))
+
+        if board_state:
+            for guess, feedback_chars in board_state:
+                guess = guess.upper()
+                if guess not in self.w2i: continue
+                row = self.table[self.w2i[guess], self.candidates_indices]
+                self.candidates_indices = self.candidates_indices[row == feedback_to_pid(feedback_chars)]
+
+        current_turn = len(board_state) if board_state else 0
+        while True:
+            if max_turns is not None and current_turn >= max_turns:
+                break
+            current_turn += 1
+            if current_turn == 1:
+                best_word = self.OPENING_WORD
+            elif len(self.candidates_indices) <= 2:
+                best_word = self.answers[self.candidates_indices[0]]
+            else:
+                bound = self.MAX_GUESSES - current_turn + 1
+                value, guess_idx = self._best_guess(self.candidates_indices, bound)
+                if value is None:
+                    # No guarantee within MAX_GUESSES: fall back to the smallest worst bucket
+                    guess_idx = self.search.ranked_guesses(self.candidates_indices)[0][0]
+                elif self.guarantee is None:
+                    self.guarantee = current_turn - 1 + value
+                best_word = self.full_dictionary[guess_idx]
+
+            self.guesses_history.append(best_word)
+            if not self.target or best_word == self.target: break
+
+            g_idx = self.w2i[best_word]
+            real_pid = self.table[g_idx, self.a2i[self.target]]
+            row = self.table[g_idx, self.candidates_indices]
+            self.candidates_indices = self.candidates_indices[row == real_pid]
+            if len(self.candidates_indices) == 0: break
+
+        self.search_time = time.time() - start_time
+        mem_tt = sys.getsizeof(self.search.tt.entries)
+        mem_history = sys.getsizeof(self.guesses_history) + sum(sys.getsizeof(w) for w in self.guesses_history)
+        self.memory_usage = self.candidates_indices.nbytes + mem_tt + mem_history
+        return self.guesses_history
+
+    def _calculate_feedback(self, guess, secret):
+        feedback = [''] * 5
+        s_list = list(secret); g_list = list(guess)
+        for i in range(5):
+            if g_list[i] == s_list[i]: feedback[i] = 'G'; s_list[i] = '#'; g_list[i] = '$'
+        for i in range(5):
+            if g_list[i] == '$': continue
+            if g_list[i] in s_list: feedback[i] = 'Y'; s_list[s_list.index(g_list[i])] = '#'
+            else: feedback[i] = 'X'
+        return tuple([f if f else 'X' for f in feedback])
+
+    def get_stats(self):
+        # Format memory intelligently
+        if self.memory_usage < 1024:
+            mem_str = f"{self.memory_usage} bytes"
+        elif self.memory_usage < 1024 * 1024:
+            mem_str = f"{self.memory_usage / 1024:.2f} KB"
+        else:
+            mem_str = f"{self.memory_usage / (1024 * 1024):.2f} MB"
+
+        return {
+            "Time": f"{self.search_time:.4f}s",
+            "Expanded Nodes": self.expanded_nodes,
+            "Total Guesses": len(self.guesses_history),
+            "Memory Usage": mem_str,
+            "Guaranteed Within": self.guarantee if self.guarantee is not None else "N/A",
+            "Cutoffs": self.search.cutoffs + self.worker_cutoffs,
+            "TT Hit Rate": f"{self.search.tt.hit_rate():.2%}",
+            "Status": "Win" if self.guesses_history and self.guesses_history[-1] == self.target else "Failed"
+        }
+
+
+@atexit.register
+def _close_root_pool():
+    if MinimaxSolver._pool is not None:
+        MinimaxSolver._pool.terminate()
+        MinimaxSolver._pool.join()
+    MinimaxSolver._pool = None
+    MinimaxSolver._pool_key = None
@@ -0,0 +1,508 @@
+import os
+import sys
+import time
+import atexit
+import pickle
+import numpy as np
+from multiprocessing import Manager, Pool, Value, cpu_count
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import (answer_axis, find_artifact, share_table, attach_table, feedback_to_pid,
+                                           win_pid, pattern_histograms, distinct_guesses, letter_masks,
+                                           informative_guesses, index_range)
+from Search_Algorithm.pattern_rows import load_pattern_data
+from Search_Algorithm.scoring import max_partitions, letter_splits
+from Search_Algorithm.transposition import zobrist_keys, candidate_fingerprint
+
+POLICY_FILE = "optimal_policy.pkl"
+# Only sets at least this big go through the shared memo; smaller ones are cheaper to recompute
+SHARED_MEMO_MIN = 8
+
+# Root workers: attached once to the shared pattern table by a pool kept across
+# turns; the incumbent and the nodes spent this turn are shared values
+worker_search = None
+worker_shm = None
+worker_best = None
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def set_lower_bound(n):
+    # One candidate can win on the first guess, every other one needs at least two
+    return 2 * n - 1 if n > 0 else 0
+
+
+class _PolicyMemo:
+    """Memo of fingerprint -> (total cost, guess, exact).
+
+    Exact entries are optimal values; the others only prove that the total cost
+    is at least the stored value. With a Manager dict, big sets are also
+    published to the other workers.
+    """
+
+    def __init__(self, shared=None):
+        self.local = {}
+        self.shared = shared
+        self.hits = 0
+
+    def get(self, fingerprint):
+        entry = self.local.get(fingerprint)
+        if entry is None and self.shared is not None and fingerprint[1] >= SHARED_MEMO_MIN:
+            entry = self.shared.get(fingerprint)
+            if entry is not None:
+                self.local[fingerprint] = entry
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def put(self, fingerprint, entry):
+        old = self.local.get(fingerprint)
+        if old is not None and (old[2] or old[0] >= entry[0]) and not entry[2]:
+            return
+        self.local[fingerprint] = entry
+        if self.shared is not None and fingerprint[1] >= SHARED_MEMO_MIN:
+            self.shared[fingerprint] = entry
+
+    def exact_entries(self):
+        return {fp: (value, guess) for fp, (value, guess, exact) in self.local.items() if exact}
+
+
+class _ExpectedSearch:
+    """Exact minimum of the total number of guesses over all answers in a set.
+
+    total_cost(S, budget) returns (cost, guess). When the optimum is below
+    budget the cost is exact; otherwise it is only a lower bound >= budget and
+    the set is cut. Expected guesses = total cost / |S|.
+    """
+
+    def __init__(self, table, win, memo, answer_rows, full_pool=False, node_budget=None, masks=None, probes=0,
+                 shared_nodes=None):
+        self.table = table
+        self.answer_rows = answer_rows
+        self.win = win
+        self.memo = memo
+        self.full_pool = full_pool
+        self.probes = probes
+        self.node_budget = node_budget
+        self.keys = zobrist_keys(table.shape[1])
+        self.all_guesses = index_range(table.shape[0])
+        self.masks = masks
+        # In a root worker the budget is spent by all root tasks of the turn together
+        self.shared_nodes = shared_nodes
+        self.nodes = 0
+        self.cutoffs = 0
+
+    def _spend_node(self):
+        self.nodes += 1
+        spent = self.nodes
+        if self.shared_nodes is not None:
+            with self.shared_nodes.get_lock():
+                self.shared_nodes.value += 1
+                spent = self.shared_nodes.value
+        if self.node_budget is not None and spent > self.node_budget:
+            raise _BudgetExceeded()
+
+    def ranked_guesses(self, candidates, pool=None):
+        """Guess pool (the set's own by default) ordered by the lower bound on its total cost.
+
+        With k non-empty buckets besides the win bucket, a guess costs at least
+        n + sum(2|b| - 1) = 3n - 2*[guess in S] - k.
+        """
+        n = len(candidates)
+        if pool is None:
+            # Guesses with the same row over S have the same cost, one per class is enough
+            rows = pool = self.answer_rows[candidates]
+            if self.full_pool:
+                pool = self.all_guesses
+                if self.masks is not None:
+                    pool = informative_guesses(self.masks, pool, candidates, rows)
+                pool = distinct_guesses(self.table, pool, candidates)
+        counts = pattern_histograms(self.table, pool, candidates, self.win + 1)
+        in_set = counts[:, self.win] > 0
+        counts[:, self.win] = 0
+        buckets = np.count_nonzero(counts, axis=1)
+        bounds = 3 * n - 2 * in_set - buckets
+        # Guesses that leave everything in one bucket never make progress
+        useful = counts.max(axis=1) < n
+        order = np.argsort(bounds, kind="stable")
+        return [(int(pool[i]), int(bounds[i])) for i in order if useful[i]]
+
+    def probe_guesses(self, candidates):
+        """The `probes` non-candidate guesses with the most possible buckets (letter
+        masks), the most even letter splits among equals, ranked like ranked_guesses."""
+        rows = self.answer_rows[candidates]
+        k = max_partitions(self.masks, self.all_guesses, candidates, self.win + 1, rows)
+        k[rows] = 1
+        others = np.flatnonzero(k > 1)
+        evenness = letter_splits(self.masks, others, candidates, rows)
+        shortlist = others[np.lexsort((-evenness, -k[others]))[:self.probes]]
+        return self.ranked_guesses(candidates, distinct_guesses(self.table, shortlist, candidates))
+
+    def probe_cost(self, candidates, value, guess_idx):
+        """(cost, guess) of the set over its pool and the probes, from the exact (value, guess_idx) over the pool."""
+        # A probe (a guess outside S) costs at least 2n
+        if not self.probes or value <= 2 * len(candidates):
+            return value, guess_idx
+        for probe_idx, bound in self.probe_guesses(candidates):
+            if bound >= value:
+                break
+            cost = self.evaluate_guess(candidates, probe_idx, bound, value)
+            if cost < value:
+                value, guess_idx = cost, probe_idx
+        return value, guess_idx
+
+    def evaluate_guess(self, candidates, guess_idx, bound, budget):
+        """Total cost of playing guess_idx, or a lower bound >= budget if it cannot beat it."""
+        n = len(candidates)
+        patterns = self.table[guess_idx, candidates]
+        pids, inverse, sizes = np.unique(patterns, return_inverse=True, return_counts=True)
+        total = n
+        remaining = bound - n
+        for b in np.argsort(-sizes, kind="stable"):
+            if pids[b] == self.win:
+                continue
+            size = int(sizes[b])
+            remaining -= set_lower_bound(size)
+            value, _ = self.total_cost(candidates[inverse == b], budget - total - remaining)
+            total += value
+            if total + remaining >= budget:
+                self.cutoffs += 1
+                return total + remaining
+        return total
+
+    def total_cost(self, candidates, budget=float("inf")):
+        n = len(candidates)
+        if n == 1:
+            return 1, int(self.answer_rows[candidates[0]])
+        if n == 2:
+            return 3, int(self.answer_rows[candidates[0]])
+        if set_lower_bound(n) >= budget:
+            return set_lower_bound(n), -1
+        fingerprint = candidate_fingerprint(candidates, self.keys)
+        entry = self.memo.get(fingerprint)
+        if entry is not None and (entry[2] or entry[0] >= budget):
+            return entry[0], entry[1]
+
+        self._spend_node()
+        best_value, best_guess = budget, -1
+        for guess_idx, bound in self.ranked_guesses(candidates):
+            # Sorted by bound, so no later guess can beat the incumbent either
+            if bound >= best_value:
+                break
+            value = self.evaluate_guess(candidates, guess_idx, bound, best_value)
+            if value < best_value:
+                best_value, best_guess = value, guess_idx
+        exact = best_guess >= 0
+        self.memo.put(fingerprint, (best_value, best_guess, exact))
+        return best_value, best_guess
+
+
+def init_root_worker(table_descriptor, win, answer_rows, full_pool, node_budget, shared_memo, best_value, masks,
+                     shared_nodes):
+    global worker_search, worker_shm, worker_best
+    worker_shm, table = attach_table(table_descriptor)
+    worker_search = _ExpectedSearch(table, win, _PolicyMemo(shared_memo), answer_rows, full_pool, node_budget, masks,
+                                    shared_nodes)
+    worker_best = best_value
+
+
+def evaluate_root_guess(args):
+    """(guess, value, nodes, complete) of one root guess.
+
+    value is None when the guess cannot beat the incumbent; complete is False
+    when the turn's node budget ran out first, so nothing was proven.
+    """
+    candidates, guess_idx, bound = args
+    search = worker_search
+    search.nodes = 0
+    budget_left = search.node_budget is None or search.shared_nodes.value < search.node_budget
+    if not budget_left:
+        return guess_idx, None, 0, False
+    with worker_best.get_lock():
+        budget = worker_best.value
+    if bound >= budget:
+        return guess_idx, None, 0, True
+    try:
+        value = search.evaluate_guess(candidates, guess_idx, bound, budget)
+    except _BudgetExceeded:
+        return guess_idx, None, search.nodes, False
+    if value >= budget:
+        return guess_idx, None, search.nodes, True
+    with worker_best.get_lock():
+        worker_best.value = min(worker_best.value, value)
+    return guess_idx, value, search.nodes, True
+
+
+def load_policy(table_shape, answers, full_pool):
+    """Cached optimal policy {fingerprint: (total cost, guess)}, or {} if missing or built for another table.
+
+    Values are optimal over the guess pool they were built with, and fingerprints
+    are answer indices, so the pool and the answer list must match too.
+    """
+    found = find_artifact(POLICY_FILE)
+    if found is None:
+        return {}
+    with open(found, 'rb') as f:
+        saved = pickle.load(f)
+    if (saved.get("table_shape") != tuple(table_shape) or saved.get("answers") != list(answers)
+            or saved.get("full_pool") != full_pool):
+        return {}
+    return saved["policy"]
+
+
+class OptimalSolver:
+    """Plays the guess that minimises the expected number of guesses over the
+    remaining candidates, computed exactly by memoised DP over the pattern
+    partitions (relative to the guess pool: the candidates, or the whole
+    dictionary with full_pool=True). The turn's own set also tries
+    PROBE_SHORTLIST other guesses against that optimum."""
+    OPENING_WORD = "SALET"
+    # Per-turn search budget; past it the turn falls back to the best-bounded guess
+    NODE_BUDGET = 50000
+    PARALLEL_MIN_CANDIDATES = 100
+    # Non-candidate guesses tried at the turn's root, by their letter-mask bucket bound;
+    # deeper sets keep the candidates, whose optimum bounds every probe
+    PROBE_SHORTLIST = 16
+
+    # Root pool and its shared memo and values, kept across turns and solves for
+    # the same table, worker count, pool and budget
+    _pool = None
+    _pool_key = None
+    _pool_manager = None
+    _pool_memo = None
+    _pool_best = None
+    _pool_nodes = None
+
+    def __init__(self, api, workers=None, full_pool=False, matrix_free=False):
+        self.api = api
+        self.target = getattr(api, 'word', None)
+        if self.target: self.target = self.target.upper()
+
+        # Without static_entropy.pkl the table is a stored artifact or computed on demand, as in A*
+        self.data = load_pattern_data(getattr(api, "words_list", None), getattr(api, "answers_list", None),
+                                      matrix_free)
+        if self.data is None:
+            raise FileNotFoundError("Thiếu static_entropy.pkl")
+        self.full_dictionary = self.data["full_dictionary"]
+        self.table = self.data["pattern_table"]
+        self.w2i = self.data["word_to_idx"]
+        self.answers, self.answer_rows, self.a2i = answer_axis(self.data)
+        self.win = win_pid(len(self.full_dictionary[0]))
+        # Only a dense table can be shared with worker processes
+        self.workers = cpu_count() if workers == 0 else (workers or 1)
+        if not isinstance(self.table, np.ndarray):
+            self.workers = 1
+        self.full_pool = full_pool
+        self.probes = 0 if full_pool else self.PROBE_SHORTLIST
+
+        self.memo = _PolicyMemo()
+        for fingerprint, (value, guess) in load_policy(self.table.shape, self.answers, full_pool).items():
+            self.memo.local[fingerprint] = (value, guess, True)
+        self.masks = letter_masks(self.full_dictionary)
+        self.search = _ExpectedSearch(self.table, self.win, self.memo, self.answer_rows, full_pool,
+                                      self.NODE_BUDGET, self.masks, self.probes)
+
+        self.guesses_history = []
+        self.search_time = 0
+        self.expanded_nodes = 0
+        self.memory_usage = 0
+        self.expected_guesses = None
+        self.exact_turns = 0
+        self.candidates_indices = index_range(len(self.answers))
+
+    def _root_pool(self):
+        """The root pool for this table and configuration, started on first use."""
+        key = (id(self.table), self.workers, self.full_pool, self.NODE_BUDGET)
+        if OptimalSolver._pool_key != key:
+            _close_root_pool()
+            OptimalSolver._pool_manager = Manager()
+            OptimalSolver._pool_memo = OptimalSolver._pool_manager.dict()
+            OptimalSolver._pool_best = Value('l', 0)
+            OptimalSolver._pool_nodes = Value('q', 0)
+            initargs = (share_table(self.table), self.win, self.answer_rows, self.full_pool, self.NODE_BUDGET,
+                        OptimalSolver._pool_memo, OptimalSolver._pool_best, self.masks,
+                        OptimalSolver._pool_nodes)
+            OptimalSolver._pool = Pool(processes=self.workers, initializer=init_root_worker, initargs=initargs)
+            OptimalSolver._pool_key = key
+        return OptimalSolver._pool
+
+    def _best_guess_parallel(self, candidates):
+        """Root guesses split over the pool under one node budget for the turn.
+
+        The minimum is exact only when every root guess was either evaluated or
+        proven no better than the incumbent; if the budget cut any of them the
+        turn returns (None, -1) like the serial search.
+        """
+        ranked = self.search.ranked_guesses(candidates)
+        pool = self._root_pool()
+        OptimalSolver._pool_best.value = np.iinfo(np.int32).max
+        OptimalSolver._pool_nodes.value = 0
+        tasks = [(candidates, guess_idx, bound) for guess_idx, bound in ranked]
+        results = {}
+        complete = True
+        for guess_idx, value, nodes, finished in pool.imap_unordered(evaluate_root_guess, tasks):
+            self.expanded_nodes += nodes
+            complete &= finished
+            if value is not None:
+                results[guess_idx] = value
+        # Keep what the workers proved for the next turns
+        shared_memo = OptimalSolver._pool_memo
+        for fingerprint, entry in shared_memo.items():
+            if entry[2]:
+                self.memo.local[fingerprint] = entry
+        shared_memo.clear()
+        if not complete or not results:
+            return None, -1
+        order = [guess_idx for guess_idx, _ in ranked]
+        best_guess = min(results, key=lambda g: (results[g], order.index(g)))
+        return results[best_guess], best_guess
+
+    def _best_guess(self, candidates):
+        """(total cost, guess) for the set over its pool and the probes, or (None, guess) when the budget ran out."""
+        self.search.nodes = 0
+        try:
+            entry = self.memo.get(candidate_fingerprint(candidates, self.search.keys))
+            if entry is not None and entry[2]:
+                value, guess_idx = entry[0], entry[1]
+            elif self.workers > 1 and len(candidates) >= self.PARALLEL_MIN_CANDIDATES:
+                value, guess_idx = self._best_guess_parallel(candidates)
+            else:
+                value, guess_idx = self.search.total_cost(candidates)
+            if value is not None:
+                return self.search.probe_cost(candidates, value, guess_idx)
+        except _BudgetExceeded:
+            pass
+        finally:
+            self.expanded_nodes += self.search.nodes
+        # Budget ran out: play the guess with the best lower bound
+        return None, self.search.ranked_guesses(candidates)[0][0]
+
+    def solve(self, board_state=None, max_turns=None):
+        start_time = time.time()
+        self.guesses_history = []
+        self.expanded_nodes = 0
+        self.expected_guesses = None
+        self.exact_turns = 0
+        self.candidates_indices = index_range(len(self.answers))
+
+        if board_state:
+            for guess, feedback_chars in board_state:
+                guess = guess.upper()
+                if guess not in self.w2i: continue
+                row = self.table[self.w2i[guess], self.candidates_indices]
+                self.candidates_indices = self.candidates_indices[row == feedback_to_pid(feedback_chars)]
+
+        current_turn = len(board_state) if board_state else 0
+        searched_turns = 0
+        while True:
+            if max_turns is not None and current_turn >= max_turns:
+                break
+            current_turn += 1
+            n = len(self.candidates_indices)
+            root_entry = self.memo.get(candidate_fingerprint(self.candidates_indices, self.search.keys))
+            if current_turn == 1 and root_entry is None:
+                best_word = self.OPENING_WORD
+            elif n <= 2:
+                best_word = self.answers[self.candidates_indices[0]]
+            else:
+                value, guess_idx = self._best_guess(self.candidates_indices)
+                searched_turns += 1
+                if value is not None:
+                    self.exact_turns += 1
+                    # Only the first searched turn is the root of the game's remaining
+                    # policy; a value proven after a fallback turn says nothing about it
+                    if searched_turns == 1:
+                        self.expected_guesses = current_turn - 1 + value / n
+                best_word = self.full_dictionary[guess_idx]
+
+            self.guesses_history.append(best_word)
+            if not self.target or best_word == self.target: break
+
+            g_idx = self.w2i[best_word]
+            real_pid = self.table[g_idx, self.a2i[self.target]]
+            row = self.table[g_idx, self.candidates_indices]
+            self.candidates_indices = self.candidates_indices[row == real_pid]
+            if len(self.candidates_indices) == 0: break
+
+        self.search_time = time.time() - start_time
+        mem_memo = sys.getsizeof(self.memo.local)
+        mem_history = sys.getsizeof(self.guesses_history) + sum(sys.getsizeof(w) for w in self.guesses_history)
+        self.memory_usage = self.candidates_indices.nbytes + mem_memo + mem_history
+        return self.guesses_history
+
+    def save_policy(self, path=POLICY_FILE):
+        """Write every exact value proven so far, so later runs can replay the policy."""
+        saved = {"table_shape": tuple(self.table.shape), "answers": list(self.answers), "full_pool": self.full_pool,
+                 "policy": self.memo.exact_entries()}
+        with open(path, 'wb') as f:
+            pickle.dump(saved, f)
+        return len(saved["policy"])
+
+    def _calculate_feedback(self, guess, secret):
+        feedback = [''] * 5
+        s_list = list(secret); g_list = list(guess)
+        for i in range(5):
+            if g_list[i] == s_list[i]: feedback[i] = 'G'; s_list[i] = '#'; g_list[i] = '$'
+        for i in range(5):
+            if g_list[i] == '$': continue
+            if g_list[i] in s_list: feedback[i] = 'Y'; s_list[s_list.index(g_list[i])] = '#'
+            else: feedback[i] = 'X'
+        return tuple([f if f else 'X' for f in feedback])
+
+    def get_stats(self):
+        # Format memory intelligently
+        if self.memory_usage < 1024:
+            mem_str = f"{self.memory_usage} bytes"
+        elif self.memory_usage < 1024 * 1024:
+            mem_str = f"{self.memory_usage / 1024:.2f} KB"
+        else:
+            mem_str = f"{self.memory_usage / (1024 * 1024):.2f} MB"
+
+        return {
+            "Time": f"{self.search_time:.4f}s",
+            "Expanded Nodes": self.expanded_nodes,
+            "Total Guesses": len(self.guesses_history),
+            "Memory Usage": mem_str,
+            "Expected Guesses": f"{self.expected_guesses:.3f}" if self.expected_guesses is not None else "N/A",
+            "Exact Turns": self.exact_turns,
+            "Memo Entries": len(self.memo.local),
+            "Cutoffs": self.search.cutoffs,
+            "Status": "Win" if self.guesses_history and self.guesses_history[-1] == self.target else "Failed"
+        }
+
+
+@atexit.register
+def _close_root_pool():
+    if OptimalSolver._pool is not None:
+        OptimalSolver._pool.terminate()
+        OptimalSolver._pool.join()
+        OptimalSolver._pool_manager.shutdown()
+    OptimalSolver._pool = None
+    OptimalSolver._pool_key = None
+    OptimalSolver._pool_manager = None
+
+
+def build_policy(workers=0):
+    """Offline: solve every bucket left by the opening word and cache the policy."""
+    solver = OptimalSolver(None, workers=workers)
+    solver.NODE_BUDGET = None
+    solver.search.node_budget = None
+    opener = solver.w2i[solver.OPENING_WORD]
+    all_candidates = index_range(len(solver.answers))
+    patterns = solver.table[opener, all_candidates]
+    t0 = time.time()
+    # Every answer pays for the opener, then for the optimal play on its bucket
+    total = len(all_candidates)
+    buckets = [pid for pid in np.unique(patterns) if pid != solver.win]
+    for count, pid in enumerate(buckets, 1):
+        bucket = all_candidates[patterns == pid]
+        total += solver._best_guess(bucket)[0] if len(bucket) > 2 else set_lower_bound(len(bucket))
+        print(f"Progress: {count}/{len(buckets)} buckets", end='\r')
+    print(f"\n✅ Expected guesses after {solver.OPENING_WORD}: {total / len(all_candidates):.4f} ({time.time()-t0:.2f}s)")
+    print(f"Done! Saved {solver.save_policy()} states to {POLICY_FILE}")
+
+
+if __name__ == "__main__":
+    build_policy()
@@ -0,0 +1,266 @@
+import os
+import atexit
+import pickle
+import numpy as np
+from multiprocessing import shared_memory
+
+DATA_FILE = "static_entropy.pkl"
+
+_cache_data = None
+_shared_tables = {}
+_cache_masks = {}
+_cache_signatures = {}
+
+
+def find_artifact(file_name):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = [file_name, os.path.join("Search_Algorithm", file_name), os.path.join("..", file_name), os.path.join(base_dir, file_name)]
+    return next((p for p in paths if os.path.exists(p)), None)
+
+
+def load_static_data():
+    """Load static_entropy.pkl once per process. Returns None if the artifact is missing."""
+    global _cache_data
+    if _cache_data is None:
+        found = find_artifact(DATA_FILE)
+        if found is None:
+            return None
+        with open(found, 'rb') as f:
+            _cache_data = pickle.load(f)
+    return _cache_data
+
+
+def index_dtype(size):
+    """Smallest unsigned dtype that holds every index below size: uint16 up to 65536 words."""
+    return np.uint16 if size <= 2 ** 16 else np.uint32
+
+
+def index_range(size):
+    """np.arange(size) in index_dtype(size).
+
+    Masks, takes and fancy indexing keep the dtype, so every candidate set or
+    guess pool derived from it stays compact.
+    """
+    return np.arange(size, dtype=index_dtype(size))
+
+
+def answer_axis(data):
+    """(answers, answer_rows, answer_to_idx) of a data pack.
+
+    Rows of the pattern table are allowed guesses (full_dictionary), columns are
+    possible answers; answer_rows[j] is the row of answer j. Packs built without
+    an answers file are square, every word being both.
+    """
+    if "answers" not in data:
+        data["answers"] = data["full_dictionary"]
+        data["answer_rows"] = index_range(len(data["full_dictionary"]))
+    data["answer_rows"] = np.asarray(data["answer_rows"], dtype=index_dtype(len(data["full_dictionary"])))
+    if "answer_to_idx" not in data:
+        data["answer_to_idx"] = {w: i for i, w in enumerate(data["answers"])}
+    return data["answers"], data["answer_rows"], data["answer_to_idx"]
+
+
+def set_static_data(data):
+    """Install an already loaded data pack, e.g. in a worker attached to a shared table."""
+    global _cache_data
+    _cache_data = data
+
+
+def share_table(table):
+    """Copy a pattern table into shared memory once per process and return its descriptor.
+
+    Worker processes attach to the block with attach_table() instead of
+    receiving a pickled copy of the matrix.
+    """
+    key = id(table)
+    if key not in _shared_tables:
+        shm = shared_memory.SharedMemory(create=True, size=max(table.nbytes, 1))
+        shared = np.ndarray(table.shape, dtype=table.dtype, buffer=shm.buf)
+        shared[...] = table
+        _shared_tables[key] = (shm, (shm.name, table.shape, table.dtype.str))
+    return _shared_tables[key][1]
+
+
+def attach_table(descriptor):
+    name, shape, dtype = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+@atexit.register
+def _release_shared_tables():
+    for shm, _ in _shared_tables.values():
+        shm.close()
+        shm.unlink()
+    _shared_tables.clear()
+
+
+def feedback_to_pid(feedback):
+    # Same encoding as precompute.py: position i contributes value * 3^i
+    p_map = {'G': 2, 'Y': 1, 'X': 0}
+    return sum(p_map[c] * (3 ** i) for i, c in enumerate(feedback))
+
+
+def win_pid(word_length=5):
+    return 3 ** word_length - 1
+
+
+def filter_indices(table, guess_idx, candidate_indices, pid, out=None):
+    """Keep the candidates whose pattern against guess_idx is pid.
+
+    With `out` the result is written into the front of that buffer and a view is
+    returned, so recursive searches can reuse one scratch row per depth.
+    """
+    row = table[guess_idx, candidate_indices]
+    keep = np.flatnonzero(row == pid)
+    if out is None:
+        return candidate_indices[keep]
+    return np.take(candidate_indices, keep, out=out[:len(keep)])
+
+
+def letter_masks(words):
+    """26-bit letter masks of a word list, cached per list.
+
+    Returns (presence [n], positional [n x L]): presence has bit c set when
+    letter c occurs in the word, positional[:, i] is the bit of the letter at i.
+    """
+    key = (id(words), len(words))
+    if key not in _cache_masks:
+        codes = np.array([[ord(c) - ord('A') for c in w.upper()] for w in words], dtype=np.uint32)
+        positional = np.left_shift(np.uint32(1), codes)
+        presence = np.bitwise_or.reduce(positional, axis=1)
+        _cache_masks[key] = (presence, positional)
+    return _cache_masks[key]
+
+
+def informative_guesses(masks, guess_indices, candidate_indices, candidate_rows=None):
+    """Drop guesses whose feedback is the same for every candidate.
+
+    Each letter of such a guess is either absent from all candidates (always
+    gray) or sits at the same position in all of them (always green), so the
+    guess carries no information. Only masks are touched, no pattern rows.
+    candidate_rows locates the candidates in the masks' word list when they
+    are answer indices of a rectangular table.
+    """
+    presence, positional = masks
+    guess_indices = np.asarray(guess_indices)
+    if len(candidate_indices) == 0:
+        return guess_indices
+    rows = candidate_indices if candidate_rows is None else candidate_rows
+    union = np.bitwise_or.reduce(presence[rows])
+    common = np.bitwise_and.reduce(positional[rows], axis=0)
+    bits = positional[guess_indices]
+    constant = ((bits & union) == 0) | ((bits & common) != 0)
+    return guess_indices[~constant.all(axis=1)]
+
+
+def letter_signatures(words):
+    """Letter codes [n x L] and letter counts [n x 26] of a word list, cached per list."""
+    key = (id(words), len(words))
+    if key not in _cache_signatures:
+        codes = np.array([[ord(c) - ord('A') for c in w.upper()] for w in words], dtype=np.uint8)
+        counts = np.zeros((len(words), 26), dtype=np.uint8)
+        for i in range(codes.shape[1]):
+            np.add.at(counts, (np.arange(len(words)), codes[:, i]), 1)
+        _cache_signatures[key] = (codes, counts)
+    return _cache_signatures[key]
+
+
+def update_hard_mode_mask(legal, signatures, guess, feedback):
+    """Apply one feedback to the hard-mode legality mask in place.
+
+    A legal guess keeps every green letter in its position and uses each
+    revealed letter at least as often as it was marked green or yellow.
+    Gray letters are not restricted.
+    """
+    codes, counts = signatures
+    guess = guess.upper()
+    required = {}
+    for i, (c, f) in enumerate(zip(guess, feedback)):
+        letter = ord(c) - ord('A')
+        if f == 'G':
+            legal &= codes[:, i] == letter
+        if f in ('G', 'Y'):
+            required[letter] = required.get(letter, 0) + 1
+    for letter, times in required.items():
+        legal &= counts[:, letter] >= times
+    return legal
+
+
+def distinct_guesses(table, guess_indices, candidate_indices):
+    """One representative per class of guesses with identical pattern rows over the candidates.
+
+    Such guesses split the candidates the same way, so every score agrees on
+    them. Rows are compared as raw bytes; the first guess of each class is
+    kept, in the original order.
+    """
+    guess_indices = np.asarray(guess_indices)
+    if len(candidate_indices) == 0 or len(guess_indices) == 0:
+        return guess_indices
+    rows = np.ascontiguousarray(table[np.ix_(guess_indices, candidate_indices)])
+    keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, first = np.unique(keys, return_index=True)
+    return guess_indices[np.sort(first)]
+
+
+def contiguous_slice(indices):
+    """indices as a slice when they are one increasing run (a bucket of a locality-ordered table), else None."""
+    indices = np.asarray(indices)
+    if len(indices) == 0 or int(indices[-1]) - int(indices[0]) + 1 != len(indices) or np.any(np.diff(indices) != 1):
+        return None
+    return slice(int(indices[0]), int(indices[-1]) + 1)
+
+
+def pattern_histograms(table, guess_indices, candidate_indices, n_patterns=243):
+    """Pattern counts of every guess against the candidate set, shape [guesses x n_patterns].
+
+    All rows are counted with a single bincount by offsetting each guess into
+    its own block of n_patterns bins.
+    """
+    if hasattr(table, "histograms"):
+        # On-disk tables stream their tiles instead of gathering the whole block
+        return table.histograms(guess_indices, candidate_indices, n_patterns)
+    columns = contiguous_slice(candidate_indices) if isinstance(table, np.ndarray) else None
+    if columns is not None:
+        # One run of columns: a strided copy per row instead of a gather
+        patterns = table[np.asarray(guess_indices), columns].astype(np.intp)
+    else:
+        patterns = table[np.ix_(guess_indices, candidate_indices)].astype(np.intp)
+    patterns += np.arange(len(guess_indices), dtype=np.intp)[:, None] * n_patterns
+    counts = np.bincount(patterns.ravel(), minlength=len(guess_indices) * n_patterns)
+    return counts.reshape(len(guess_indices), n_patterns)
+
+
+def lookahead_entropy(table, guess_indices, candidate_indices, second_indices, n_patterns=243):
+    """Two-ply score of every guess: the entropy of its split, plus for each of its
+    buckets the best entropy a guess from second_indices gets inside that bucket,
+    weighted by the bucket probability.
+
+    The second-guess patterns are gathered once. Per first guess, all
+    (second guess, bucket, pattern) cells are counted in one pass and
+    H(bucket | h) = log2|b| - sum(c * log2 c) / |b| is read off per cell.
+    """
+    n = len(candidate_indices)
+    scores = np.zeros(len(guess_indices))
+    if n == 0:
+        return scores
+    second = table[np.ix_(second_indices, candidate_indices)].astype(np.int64)
+    rows = np.arange(len(second_indices), dtype=np.int64)[:, None]
+    for k, guess_idx in enumerate(guess_indices):
+        _, bucket, sizes = np.unique(table[guess_idx, candidate_indices], return_inverse=True, return_counts=True)
+        probs = sizes / n
+        n_cells = len(second_indices) * len(sizes)
+        keys = (rows * len(sizes) + bucket.reshape(1, -1)) * n_patterns + second
+        cells, counts = np.unique(keys, return_counts=True)
+        clogc = np.bincount(cells // n_patterns, weights=counts * np.log2(counts), minlength=n_cells)
+        conditional = np.log2(sizes) - clogc.reshape(len(second_indices), len(sizes)) / sizes
+        scores[k] = -np.sum(probs * np.log2(probs)) + np.dot(probs, conditional.max(axis=0))
+    return scores
+
+
+def entropy_from_counts(counts):
+    totals = counts.sum(axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probs = counts / totals
+        terms = np.where(counts > 0, probs * np.log2(probs), 0.0)
+    return -terms.sum(axis=-1)
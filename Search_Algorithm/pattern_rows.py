@@ -0,0 +1,320 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import DATA_FILE, find_artifact, load_static_data, entropy_from_counts
+
+# Default byte budget of the row cache of a matrix-free table
+ROW_CACHE_BYTES = 64 * 1024 * 1024
+# Guesses per kernel call, bounds the [guesses x answers x L] temporaries
+KERNEL_BLOCK = 128
+# A batch read computes whole rows (and caches them) only when the requested
+# columns cover at least this fraction of the answers; otherwise only the cells
+FULL_ROW_MIN_FRACTION = 0.25
+# Openers whose feedback buckets key the locality order of an artifact, most significant first:
+# the first guess of A*, Minimax, Optimal and MCTS, then the one of the entropy solver
+LOCALITY_OPENERS = ("SALET", "SOARE")
+
+_cache_lazy = {}
+
+
+def letter_codes(words):
+    """Packed letter array [n x L], one uint8 code (0-25) per letter."""
+    return np.array([[ord(c) - ord('A') for c in w.upper()] for w in words], dtype=np.uint8).reshape(len(words), -1)
+
+
+def pattern_dtype(word_length):
+    return np.uint8 if 3 ** word_length <= 256 else np.uint16
+
+
+def letter_counts(codes):
+    """Occurrences of each letter per word, shape [26 x n]."""
+    counts = np.zeros((26, len(codes)), dtype=np.int8)
+    for i in range(codes.shape[1]):
+        counts[codes[:, i], np.arange(len(codes))] += 1
+    return counts
+
+
+def feedback_block(guess_codes, answer_codes, big_endian=False, answer_counts=None):
+    """Pattern ids of every guess against every answer, shape [guesses x answers].
+
+    Position i is yellow when it is not green and fewer earlier non-green copies
+    of its letter precede it than the answer has unmatched copies of that letter,
+    the usual left-to-right Wordle rule. Unmatched copies are the answer's letter
+    count (one gather) minus the greens on that letter, and which guess positions
+    share a letter is known per guess, so no step compares letters pairwise
+    across answers. Little-endian ids match static_entropy.pkl, big-endian ids
+    match pattern_matrix.npy.
+    """
+    length = guess_codes.shape[1]
+    if answer_counts is None:
+        answer_counts = letter_counts(answer_codes)
+    by_position = np.ascontiguousarray(answer_codes.T)
+    green = [guess_codes[:, i, None] == by_position[i] for i in range(length)]
+    same = guess_codes[:, :, None] == guess_codes[:, None, :]
+    pids = np.zeros((len(guess_codes), len(answer_codes)), dtype=pattern_dtype(length))
+    for i in range(length):
+        # A green position is counted in unmatched too, it never turns yellow
+        unmatched = answer_counts[guess_codes[:, i]] - green[i].view(np.int8)
+        before = np.zeros(pids.shape, dtype=np.int8)
+        for j in range(length):
+            if j != i and same[:, i, j].any():
+                shared = same[:, i, j, None]
+                unmatched -= (green[j] & shared).view(np.int8)
+                if j < i:
+                    before += (~green[j] & shared).view(np.int8)
+        yellow = ~green[i] & (before < unmatched)
+        weight = 3 ** (length - 1 - i) if big_endian else 3 ** i
+        pids += green[i].view(np.uint8) * pids.dtype.type(2 * weight)
+        pids += yellow.view(np.uint8) * pids.dtype.type(weight)
+    return pids
+
+
+def locality_order(words, openers=LOCALITY_OPENERS):
+    """Permutation that makes words sharing a feedback bucket under the openers contiguous.
+
+    Buckets of the first opener come first, then the next opener splits them;
+    inside a bucket words stay alphabetical. The candidates left after an opening
+    then sit next to each other, in rows and in columns of a table built in this order.
+    """
+    codes = letter_codes(words)
+    keys = [feedback_block(letter_codes([o]), codes)[0] for o in reversed(openers) if len(o) == codes.shape[1]]
+    return np.lexsort([np.array([w.upper() for w in words])] + keys)
+
+
+def group_by_block(indices, block_size):
+    """(block, positions) for every block the indices fall in, positions into `indices`."""
+    blocks = indices // block_size
+    order = np.argsort(blocks, kind="stable")
+    cuts = np.flatnonzero(np.diff(blocks[order])) + 1
+    for positions in np.split(order, cuts):
+        if len(positions):
+            yield int(blocks[positions[0]]), positions
+
+
+class BlockPatternTable:
+    """Dense-table indexing for stored tables: table[g, c], table[g_idx, t_idx] and
+    table[np.ix_(guesses, candidates)]. Subclasses implement _read(guesses, answers)."""
+    ndim = 2
+
+    def _read(self, guess_indices, answer_indices):
+        raise NotImplementedError
+
+    def __getitem__(self, key):
+        guess_key, answer_key = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(answer_key, slice):
+            answer_key = np.arange(self.shape[1])[answer_key]
+        guess_arr = np.asarray(guess_key)
+        answer_arr = np.asarray(answer_key)
+        if guess_arr.ndim == 2:
+            return self._read(guess_arr.ravel(), answer_arr.ravel())
+        block = self._read(np.atleast_1d(guess_arr), np.atleast_1d(answer_arr))
+        if guess_arr.ndim == 0:
+            block = block[0]
+        return block[..., 0] if answer_arr.ndim == 0 else block
+
+
+class LazyPatternTable:
+    """Pattern table [guesses x answers] computed on demand instead of stored.
+
+    Reads use the same indexing as the dense table: table[g, c], table[g_idx, t_idx]
+    and table[np.ix_(guesses, candidates)]. Single-row reads and batch reads
+    covering most answers compute whole rows and keep them in an LRU cache bounded
+    by cache_bytes; narrow batch reads compute only the requested cells.
+    """
+
+    def __init__(self, guesses, answers=None, cache_bytes=None, big_endian=False):
+        self.guess_codes = letter_codes(guesses)
+        self.answer_codes = self.guess_codes if answers is None else letter_codes(answers)
+        self.answer_counts = letter_counts(self.answer_codes)
+        self.big_endian = big_endian
+        self.dtype = np.dtype(pattern_dtype(self.guess_codes.shape[1]))
+        self.shape = (len(self.guess_codes), len(self.answer_codes))
+        self.ndim = 2
+        self.row_bytes = self.shape[1] * self.dtype.itemsize
+        self.cache_bytes = ROW_CACHE_BYTES if cache_bytes is None else cache_bytes
+        self.max_rows = max(1, self.cache_bytes // self.row_bytes)
+        self._rows = OrderedDict()
+        # Scoring threads read the same table
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.computed_cells = 0
+
+    @property
+    def nbytes(self):
+        return len(self._rows) * self.row_bytes
+
+    def _compute(self, guess_indices, answer_indices=None):
+        answers, counts = self.answer_codes, self.answer_counts
+        if answer_indices is not None:
+            answers, counts = answers[answer_indices], counts[:, answer_indices]
+        out = np.empty((len(guess_indices), len(answers)), dtype=self.dtype)
+        for start in range(0, len(guess_indices), KERNEL_BLOCK):
+            block = guess_indices[start:start + KERNEL_BLOCK]
+            out[start:start + len(block)] = feedback_block(self.guess_codes[block], answers, self.big_endian, counts)
+        with self._lock:
+            self.computed_cells += out.size
+        return out
+
+    def rows(self, guess_indices, cache=True):
+        """Full rows of the guesses, from the cache where possible."""
+        guess_indices = np.atleast_1d(np.asarray(guess_indices, dtype=np.intp))
+        out = np.empty((len(guess_indices), self.shape[1]), dtype=self.dtype)
+        missing = []
+        with self._lock:
+            for k, g in enumerate(guess_indices.tolist()):
+                row = self._rows.get(g)
+                if row is None:
+                    missing.append(k)
+                else:
+                    self._rows.move_to_end(g)
+                    out[k] = row
+            self.hits += len(guess_indices) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            computed = self._compute(guess_indices[missing])
+            out[missing] = computed
+            if cache:
+                with self._lock:
+                    for g, row in zip(guess_indices[missing].tolist(), computed):
+                        self._rows[g] = row
+                        self._rows.move_to_end(g)
+                    while len(self._rows) > self.max_rows:
+                        self._rows.popitem(last=False)
+        return out
+
+    def _cells(self, guess_indices, answer_indices):
+        """[guesses x answers] block: cached rows are gathered, the rest computed on the columns only."""
+        guess_indices = np.asarray(guess_indices, dtype=np.intp)
+        answer_indices = np.asarray(answer_indices, dtype=np.intp)
+        if len(answer_indices) >= FULL_ROW_MIN_FRACTION * self.shape[1] and len(guess_indices) <= self.max_rows:
+            return self.rows(guess_indices)[:, answer_indices]
+        out = np.empty((len(guess_indices), len(answer_indices)), dtype=self.dtype)
+        with self._lock:
+            cached = [(k, self._rows[g]) for k, g in enumerate(guess_indices.tolist()) if g in self._rows]
+        for k, row in cached:
+            out[k] = row[answer_indices]
+        missing = np.setdiff1d(np.arange(len(guess_indices)), [k for k, _ in cached], assume_unique=True)
+        if len(missing):
+            out[missing] = self._compute(guess_indices[missing], answer_indices)
+        with self._lock:
+            self.hits += len(cached)
+            self.misses += len(missing)
+        return out
+
+    def __getitem__(self, key):
+        guess_key, answer_key = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(answer_key, slice):
+            answer_key = np.arange(self.shape[1])[answer_key]
+        guess_arr = np.asarray(guess_key)
+        answer_arr = np.asarray(answer_key)
+        if guess_arr.ndim == 0:
+            return self.rows([int(guess_arr)])[0][answer_arr]
+        if guess_arr.ndim == 2:
+            # np.ix_ form: [g x 1] rows and [1 x c] columns
+            return self._cells(guess_arr.ravel(), answer_arr.ravel())
+        if answer_arr.ndim == 0:
+            return self.rows(guess_arr)[:, int(answer_arr)]
+        return self._cells(guess_arr, answer_arr)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LazyStaticEntropy:
+    """Entropy of each guess over all answers, computed on first use per guess.
+
+    Indexes like the dense static entropy array. Its rows bypass the table's
+    cache: each is read once and would only push out the hot rows.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.values = np.full(table.shape[0], np.nan)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, guess_indices):
+        guess_indices = np.asarray(guess_indices, dtype=np.intp)
+        todo = np.unique(guess_indices[np.isnan(self.values[guess_indices])])
+        n_patterns = 3 ** self.table.guess_codes.shape[1]
+        for start in range(0, len(todo), KERNEL_BLOCK):
+            block = todo[start:start + KERNEL_BLOCK]
+            rows = self.table.rows(block, cache=False).astype(np.intp)
+            rows += np.arange(len(block), dtype=np.intp)[:, None] * n_patterns
+            counts = np.bincount(rows.ravel(), minlength=len(block) * n_patterns).reshape(len(block), n_patterns)
+            self.values[block] = entropy_from_counts(counts)
+        return self.values[guess_indices]
+
+
+def dense_fits(nbytes, headroom=2.0):
+    """Whether a dense table of nbytes fits in available memory with some headroom.
+
+    Without psutil the answer is always yes, the dense path stays the default.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return True
+    return nbytes * headroom <= psutil.virtual_memory().available
+
+
+def lazy_static_data(words, answers=None, cache_bytes=None):
+    """Matrix-free stand-in for static_entropy.pkl over the given word lists, cached per list."""
+    square = answers is None or answers is words
+    words = [w.upper() for w in words]
+    answers = words if square else [w.upper() for w in answers]
+    key = (tuple(words), None if square else tuple(answers), cache_bytes)
+    if key not in _cache_lazy:
+        word_to_idx = {w: i for i, w in enumerate(words)}
+        table = LazyPatternTable(words, None if square else answers, cache_bytes)
+        _cache_lazy[key] = {
+            "pattern_table": table,
+            "static_entropy": LazyStaticEntropy(table),
+            "full_dictionary": words,
+            "word_to_idx": word_to_idx,
+            "answers": answers,
+            "answer_rows": np.array([word_to_idx[w] for w in answers]),
+        }
+    return _cache_lazy[key]
+
+
+def load_stored_data(words=None):
+    """The compressed, else the tiled artifact, if one was built for these words (any words if None).
+
+    The artifact may list the words in another order (locality builds); callers
+    index it through its own full_dictionary and word_to_idx.
+    """
+    from Search_Algorithm.compressed_matrix import load_compressed_data
+    from Search_Algorithm.tiled_matrix import load_tiled_data
+    for loader in (load_compressed_data, load_tiled_data):
+        data = loader()
+        if data is not None and (words is None or sorted(data["full_dictionary"]) == sorted(w.upper() for w in words)):
+            return data
+    return None
+
+
+def load_pattern_data(words=None, answers=None, matrix_free=False, cache_bytes=None):
+    """static_entropy.pkl when it exists and fits in memory, then a compressed or tiled
+    artifact built for these words, otherwise a matrix-free pack over words.
+
+    Returns None when there is neither an artifact nor a word list to compute from.
+    """
+    if not matrix_free:
+        found = find_artifact(DATA_FILE)
+        if found is None or dense_fits(os.path.getsize(found)):
+            data = load_static_data()
+            if data is not None:
+                return data
+        stored = load_stored_data(words)
+        if stored is not None:
+            return stored
+    if words is None:
+        return None
+    return lazy_static_data(words, answers, cache_bytes)
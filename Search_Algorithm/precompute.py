@@ -8,8 +8,9 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from words_api import Words
+from Search_Algorithm.pattern_rows import locality_order
 
-def generate_static_data():
+def generate_static_data(locality=False):
     print("Initializing static data (Static Entropy)...")
     t0 = time.time()
 
@@ -18,7 +19,14 @@ def generate_static_data():
     
     api = Words(5) 
     full_dictionary = [w.upper() for w in api.words_list] 
-    candidates = full_dictionary 
+    # Answers are columns; without an answers file every word is one
+    candidates = [w.upper() for w in api.answers_list]
+    if locality:
+        # Words sharing opener buckets become neighbouring rows and columns;
+        # word_to_idx below follows the new order
+        square = candidates == full_dictionary
+        full_dictionary = [full_dictionary[i] for i in locality_order(full_dictionary)]
+        candidates = full_dictionary if square else [candidates[i] for i in locality_order(candidates)]
     
     n_guess = len(full_dictionary)
     n_cand = len(candidates)
@@ -28,6 +36,7 @@ def generate_static_data():
     
     
     word_to_idx = {w: i for i, w in enumerate(full_dictionary)}
+    answer_rows = np.array([word_to_idx[w] for w in candidates])
     
     print("  > Creating Pattern Table (Numpy)...")
     
@@ -52,12 +61,12 @@ def generate_static_data():
             
             for k in range(5):
                 if temp_g[k] == s_chars[k]:
-                    p_vals[k] = 2; s_chars[k] = '
+                    p_vals[k] = 2; s_chars[k] = '#'; temp_g[k] = '$'
             
             for k in range(5):
                 if temp_g[k] == '$': continue
                 if temp_g[k] in s_chars:
-                    p_vals[k] = 1; s_chars[s_chars.index(temp_g[k])] = '
+                    p_vals[k] = 1; s_chars[s_chars.index(temp_g[k])] = '#'
             
             
             pid = sum(v * (3**k) for k, v in enumerate(p_vals))
@@ -85,7 +94,9 @@ def generate_static_data():
         "pattern_table": table, 
         "entropy_map": entropy_map,
         "full_dictionary": full_dictionary,
-        "word_to_idx": word_to_idx
+        "word_to_idx": word_to_idx,
+        "answers": candidates,
+        "answer_rows": answer_rows
     }
     
     with open("static_entropy.pkl", "wb") as f:
@@ -94,4 +105,4 @@ def generate_static_data():
     print(f"DONE! Saved to 'static_entropy.pkl'. Time: {time.time()-t0:.2f}s")
 
 if __name__ == "__main__":
-    generate_static_data()
\ No newline at end of file
+    generate_static_data("--locality" in sys.argv)
\ No newline at end of file
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import numpy as np
+from multiprocessing import Pool, cpu_count
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import (load_static_data, answer_axis, share_table, attach_table,
+                                           pattern_histograms, win_pid, index_range)
+from Search_Algorithm.heuristics import lower_bound_guesses, BOUNDS_FILE
+
+# Admissible guesses-needed bound per set size, for every size up to the answer
+# count. M(k), the largest set any plan solves within k guesses, is bounded over
+# every guess of the dictionary: a guess wins on itself and each of its buckets
+# over the whole answer list keeps at most min(|bucket|, M(k - 1)) answers of a
+# set solved in k - 1 more. The bound of size n is the smallest k with M(k) >= n.
+GUESS_CHUNK = 1024
+
+shared_shm = None
+shared_table = None
+shared_win = None
+shared_is_answer = None
+
+
+def init_worker(table_descriptor, is_answer, win):
+    global shared_shm, shared_table, shared_win, shared_is_answer
+    shared_shm, shared_table = attach_table(table_descriptor)
+    shared_win = win
+    shared_is_answer = is_answer
+
+
+def best_split(args):
+    """Largest set any guess of the chunk can solve within k guesses, given M(k - 1)."""
+    guesses, previous = args
+    counts = pattern_histograms(shared_table, guesses, index_range(shared_table.shape[1]), shared_win + 1)
+    counts[:, shared_win] = 0
+    solvable = np.minimum(counts, previous).sum(axis=1) + shared_is_answer[guesses]
+    return int(solvable.max())
+
+
+def generate_bounds():
+    print("Loading pattern table...")
+    data = load_static_data()
+    if data is None: raise FileNotFoundError("Missing static_entropy.pkl. Run precompute.py first!")
+
+    full_dict = data["full_dictionary"]
+    table = data["pattern_table"]
+    answers, answer_rows, _ = answer_axis(data)
+    is_answer = np.zeros(len(full_dict), dtype=np.int64)
+    is_answer[answer_rows] = 1
+    n_answers = len(answers)
+    chunks = np.array_split(index_range(len(full_dict)), max(1, len(full_dict) // GUESS_CHUNK))
+
+    print(f"🚀 Bounding solvable set sizes over {len(full_dict)} guesses on {cpu_count()} CPU cores...")
+    t0 = time.time()
+    solvable = [1]
+    initargs = (share_table(table), is_answer, win_pid(len(full_dict[0])))
+    with Pool(processes=cpu_count(), initializer=init_worker, initargs=initargs) as pool:
+        while solvable[-1] < n_answers:
+            tasks = [(chunk, solvable[-1]) for chunk in chunks]
+            solvable.append(max(pool.imap_unordered(best_split, tasks)))
+            print(f"  Within {len(solvable)} guesses: at most {solvable[-1]} answers")
+    print(f"✅ Completed in {time.time()-t0:.2f}s.")
+
+    bounds = (1 + np.searchsorted(solvable, np.arange(n_answers + 1))).astype(np.uint8)
+    bounds[0] = 0
+    # Never looser than the analytic bound
+    n_patterns = 3 ** len(full_dict[0])
+    analytic = np.array([lower_bound_guesses(n, n_patterns) for n in range(n_answers + 1)], dtype=np.uint8)
+    bounds = np.maximum(bounds, analytic)
+
+    np.save(BOUNDS_FILE, bounds)
+    print(f"Done! Saved {len(bounds)} bounds to {BOUNDS_FILE}")
+
+
+if __name__ == "__main__":
+    generate_bounds()
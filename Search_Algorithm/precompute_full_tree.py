@@ -6,18 +6,21 @@ import sys
 import time
 from multiprocessing import Pool, cpu_count
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import answer_axis, index_range
 
 DATA_FILE = "static_entropy.pkl"
 TREE_FILE = "full_turn2_tree.pkl"
 shared_table = None
 shared_full_dict = None
 shared_w2i = None
+shared_answer_rows = None
 
 def init_worker(data_pack):
-    global shared_table, shared_full_dict, shared_w2i
+    global shared_table, shared_full_dict, shared_w2i, shared_answer_rows
     shared_table = data_pack["pattern_table"]
     shared_full_dict = data_pack["full_dictionary"]
     shared_w2i = data_pack["word_to_idx"]
+    _, shared_answer_rows, _ = answer_axis(data_pack)
 def calculate_best_next_move(args):
     start_word_idx, all_candidate_indices = args
     patterns = shared_table[start_word_idx, all_candidate_indices]
@@ -27,12 +30,12 @@ def calculate_best_next_move(args):
         subset_indices = all_candidate_indices[inverse_indices == i]
         if len(subset_indices) == 0: continue
         if len(subset_indices) == 1:
-            best_idx = subset_indices[0]
+            best_idx = shared_answer_rows[subset_indices[0]]
             result_map[pid] = best_idx
             continue
         best_score = -1.0
         best_idx = -1
-        for guess_idx in subset_indices:
+        for guess_idx in shared_answer_rows[subset_indices]:
             sub_patterns = shared_table[guess_idx, subset_indices]
             _, counts = np.unique(sub_patterns, return_counts=True)
             total = len(subset_indices)
@@ -54,7 +57,8 @@ def generate_full_tree():
         data = pickle.load(f)
     
     full_dict = data["full_dictionary"]
-    all_candidates = np.arange(len(full_dict))
+    answers, _, _ = answer_axis(data)
+    all_candidates = index_range(len(answers))
     
     print(f"🚀 Starting parallel computation on {cpu_count()} CPU cores.")
     print(f"Workload: {len(full_dict)} starting words. Go grab a coffee...")
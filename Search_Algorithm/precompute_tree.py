@@ -5,8 +5,11 @@ import math
 import sys
 from tqdm import tqdm
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import answer_axis, index_range
+from Search_Algorithm.scoring import score_guesses
 
 OPENING_WORD = "SALET"
+SCORER = "entropy"
 DATA_FILE = "static_entropy.pkl"
 TREE_FILE = "turn2_lookup.pkl"
 
@@ -19,10 +22,7 @@ def load_data():
         return pickle.load(f)
 
 def calculate_entropy(table, guess_idx, candidates_indices):
-    patterns = table[guess_idx, candidates_indices]
-    _, counts = np.unique(patterns, return_counts=True)
-    probs = counts / len(candidates_indices)
-    return -np.sum(probs * np.log2(probs))
+    return score_guesses(table, [guess_idx], candidates_indices, "entropy", n_patterns=3 ** len(OPENING_WORD))[0]
 
 def generate_tree():
     print(f"🚀 Building Decision Tree for turn 2 (Base: {OPENING_WORD})...")
@@ -31,14 +31,14 @@ def generate_tree():
     table = data["pattern_table"]
     w2i = data["word_to_idx"]
     full_dict = data["full_dictionary"]
-    
+    answers, answer_rows, _ = answer_axis(data)
     
     if OPENING_WORD not in w2i:
         print(f"Error: {OPENING_WORD} not found in dictionary.")
         return
     
     start_idx = w2i[OPENING_WORD]
-    all_candidates = np.arange(len(full_dict))
+    all_candidates = index_range(len(answers))
     
     
     turn2_map = {}
@@ -47,7 +47,7 @@ def generate_tree():
     
     print("⏳ Calculating optimal moves for each feedback pattern...")
     
-    for pid in tqdm(range(243)):
+    for pid in tqdm(range(3 ** len(OPENING_WORD))):
         
         
         row = table[start_idx, all_candidates]
@@ -59,20 +59,15 @@ def generate_tree():
             
         
         if len(subset_indices) == 1:
-            best_word = full_dict[subset_indices[0]]
+            best_word = answers[subset_indices[0]]
             turn2_map[pid] = best_word
             continue
             
         
         
-        best_score = -1.0
-        best_idx = -1
-        
-        for idx in subset_indices:
-            ent = calculate_entropy(table, idx, subset_indices)
-            if ent > best_score:
-                best_score = ent
-                best_idx = idx
+        guesses = answer_rows[subset_indices]
+        scores = score_guesses(table, guesses, subset_indices, SCORER, n_patterns=3 ** len(OPENING_WORD))
+        best_idx = guesses[int(np.argmax(scores))]
         
         turn2_map[pid] = full_dict[best_idx]
         
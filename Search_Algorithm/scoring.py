@@ -0,0 +1,234 @@
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from Search_Algorithm.pattern_data import pattern_histograms, entropy_from_counts
+
+# Slack so that a guess whose bound only ties the incumbent is still evaluated
+BOUND_EPS = 1e-9
+# Smallest slice of guesses worth handing to a scoring thread
+MIN_ROWS_PER_THREAD = 32
+
+_executors = {}
+
+# Every scorer maps a [guesses x patterns] count matrix to one score per guess,
+# higher is better. All of them read the same histogram, so one bincount can
+# feed several scores.
+
+
+def entropy_score(counts):
+    return entropy_from_counts(counts)
+
+
+def expected_remaining_score(counts):
+    # E[remaining] = sum(c^2) / n, no log calls
+    totals = np.maximum(counts.sum(axis=-1), 1)
+    return -(counts.astype(np.float64) ** 2).sum(axis=-1) / totals
+
+
+def partitions_score(counts):
+    return np.count_nonzero(counts, axis=-1).astype(np.float64)
+
+
+def worst_case_score(counts):
+    return -counts.max(axis=-1).astype(np.float64)
+
+
+SCORERS = {
+    "entropy": entropy_score,
+    "expected_remaining": expected_remaining_score,
+    "partitions": partitions_score,
+    "worst_case": worst_case_score,
+}
+
+# Best score a guess can reach on n candidates with at most k buckets
+SCORE_BOUNDS = {
+    "entropy": lambda n, k: np.log2(k),
+    "expected_remaining": lambda n, k: -n / k,
+    "partitions": lambda n, k: k.astype(np.float64),
+    "worst_case": lambda n, k: -np.ceil(n / k),
+}
+
+
+def get_scorer(name):
+    if name not in SCORERS:
+        raise ValueError(f"Unknown scorer '{name}'. Choose from: {', '.join(SCORERS)}")
+    return SCORERS[name]
+
+
+def score_counts(counts, scorer="entropy"):
+    """Score a histogram with one scorer name, or with a list of names (returns a dict)."""
+    if isinstance(scorer, str):
+        return get_scorer(scorer)(counts)
+    return {name: get_scorer(name)(counts) for name in scorer}
+
+
+def resolve_workers(workers):
+    return (os.cpu_count() or 1) if workers == 0 else (workers or 1)
+
+
+def _executor(workers):
+    if workers not in _executors:
+        _executors[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scoring")
+    return _executors[workers]
+
+
+def map_guess_chunks(fn, guess_indices, workers=1):
+    """Apply fn to slices of the guess list on a thread pool and concatenate the rows.
+
+    The gathers and bincounts inside fn run in NumPy and mostly release the GIL;
+    every thread reads the same table, nothing is copied per thread.
+    """
+    guess_indices = np.asarray(guess_indices)
+    parts = min(workers, len(guess_indices) // MIN_ROWS_PER_THREAD)
+    if parts <= 1:
+        return fn(guess_indices)
+    return np.concatenate(list(_executor(workers).map(fn, np.array_split(guess_indices, parts))))
+
+
+def batched_histograms(table, guess_indices, candidate_indices, workers=1, n_patterns=243):
+    return map_guess_chunks(lambda part: pattern_histograms(table, part, candidate_indices, n_patterns),
+                            guess_indices, workers)
+
+
+def score_guesses(table, guess_indices, candidate_indices, scorer="entropy", workers=1, n_patterns=243):
+    if not isinstance(scorer, str):
+        return score_counts(pattern_histograms(table, guess_indices, candidate_indices, n_patterns), scorer)
+    score = get_scorer(scorer)
+    return map_guess_chunks(lambda part: score(pattern_histograms(table, part, candidate_indices, n_patterns)),
+                            guess_indices, workers)
+
+
+def max_partitions(masks, guess_indices, candidate_indices, n_patterns=243, candidate_rows=None):
+    """Upper bound on the number of buckets each guess can produce, from letter masks only.
+
+    Per position the feedback is fixed when the letter is absent from every
+    candidate (gray) or in place in every candidate (green); it cannot be green
+    when no candidate has the letter there. Otherwise all three colours may occur.
+    """
+    presence, positional = masks
+    rows = candidate_indices if candidate_rows is None else candidate_rows
+    union = np.bitwise_or.reduce(presence[rows])
+    at_position = np.bitwise_or.reduce(positional[rows], axis=0)
+    common = np.bitwise_and.reduce(positional[rows], axis=0)
+    bits = positional[guess_indices]
+    outcomes = np.where((bits & at_position) != 0, 3, 2)
+    outcomes[((bits & union) == 0) | ((bits & common) != 0)] = 1
+    k = np.prod(outcomes.astype(np.int64), axis=1)
+    return np.minimum(k, min(len(candidate_indices), n_patterns))
+
+
+def letter_splits(masks, guess_indices, candidate_indices, candidate_rows=None):
+    """How evenly the letters of each guess split the set, from letter masks only.
+
+    Each distinct letter of a guess scores min(candidates with it, without it),
+    and each position min(candidates with that letter there, elsewhere). Higher
+    is a more even split; it orders guesses before any pattern row is read.
+    """
+    presence, positional = masks
+    rows = candidate_indices if candidate_rows is None else candidate_rows
+    letters = np.arange(26, dtype=np.uint32)
+    with_letter = ((presence[rows, None] >> letters) & 1).sum(axis=0).astype(np.int64)
+    has_letter = ((presence[guess_indices, None] >> letters) & 1).astype(bool)
+    score = has_letter @ np.minimum(with_letter, len(rows) - with_letter)
+    codes = np.log2(positional).astype(np.intp)
+    for i in range(positional.shape[1]):
+        letter = codes[guess_indices, i]
+        there = np.bincount(codes[rows, i], minlength=26)[letter]
+        score += np.minimum(there, with_letter[letter] - there)
+    return score
+
+
+def best_guess(table, guess_indices, candidate_indices, masks, scorer="entropy", prefer=None, chunk=64, workers=1,
+               candidate_rows=None, n_patterns=243):
+    """Branch-and-bound argmax of a scorer over guess_indices.
+
+    Guesses are scored in chunks, best bound first. A guess is skipped once its
+    bound is below the incumbent, or only ties it without winning the tie-break
+    of the exhaustive scan: preferred guesses (e.g. candidates) first, then the
+    earlier position. With workers > 1 each round takes one chunk per thread.
+    Returns (guess, score, evaluated, pruned).
+    """
+    guess_indices = np.asarray(guess_indices)
+    get_scorer(scorer)
+    chunk *= workers
+    n = len(candidate_indices)
+    prefer = np.zeros(len(guess_indices), dtype=bool) if prefer is None else np.asarray(prefer)
+    if len(guess_indices) <= chunk:
+        # A single chunk: bounds would not save any histogram
+        scores = score_guesses(table, guess_indices, candidate_indices, scorer, workers, n_patterns)
+        pick = np.lexsort((~prefer, -scores))[0]
+        return int(guess_indices[pick]), float(scores[pick]), len(guess_indices), 0
+    bounds = SCORE_BOUNDS[scorer](n, max_partitions(masks, guess_indices, candidate_indices, n_patterns,
+                                                    candidate_rows=candidate_rows))
+    pending = np.argsort(-bounds, kind="stable")
+
+    best_pos, best_score = -1, -np.inf
+    evaluated = 0
+    while len(pending):
+        if best_pos >= 0:
+            wins_tie = (prefer[pending] & ~prefer[best_pos]) | ((prefer[pending] == prefer[best_pos]) & (pending < best_pos))
+            pending = pending[(bounds[pending] > best_score + BOUND_EPS) |
+                              ((bounds[pending] >= best_score - BOUND_EPS) & wins_tie)]
+            if len(pending) == 0:
+                break
+        positions, pending = pending[:chunk], pending[chunk:]
+        scores = score_guesses(table, guess_indices[positions], candidate_indices, scorer, workers, n_patterns)
+        evaluated += len(positions)
+        if best_pos >= 0:
+            positions = np.append(positions, best_pos)
+            scores = np.append(scores, best_score)
+        pick = np.lexsort((positions, ~prefer[positions], -scores))[0]
+        best_pos, best_score = int(positions[pick]), float(scores[pick])
+    return int(guess_indices[best_pos]), best_score, evaluated, len(guess_indices) - evaluated
+
+
+def entropy_estimates(counts, population):
+    """Miller-Madow corrected entropy and its standard error from histograms of a sample.
+
+    The sample is drawn without replacement from `population` candidates, so the
+    delta-method variance gets the finite population correction.
+    """
+    m = counts.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probs = counts / m[:, None]
+        logs = np.where(counts > 0, np.log2(probs), 0.0)
+    plugin = -(probs * logs).sum(axis=-1)
+    buckets = np.count_nonzero(counts, axis=-1)
+    corrected = plugin + (buckets - 1) / (2 * m * np.log(2))
+    variance = ((probs * logs ** 2).sum(axis=-1) - plugin ** 2) / m * (1 - m / population)
+    return corrected, np.sqrt(np.maximum(variance, 0.0))
+
+
+def estimate_best_guess(table, guess_indices, candidate_indices, sample_size=256, z=2.0, prefer=None, rng=np.random,
+                        workers=1, n_patterns=243):
+    """Entropy argmax from candidate samples, refined only where it matters.
+
+    Every round scores the surviving guesses on a sample of the candidates and
+    keeps those whose confidence interval reaches the leader's. The sample then
+    doubles (samples are nested prefixes of one permutation) until one guess is
+    left or the sample is the whole set, where the scores become exact.
+    Returns (guess, entropy estimate, evaluated cells, rounds).
+    """
+    guess_indices = np.asarray(guess_indices)
+    n = len(candidate_indices)
+    prefer = np.zeros(len(guess_indices), dtype=bool) if prefer is None else np.asarray(prefer)
+    order = rng.permutation(n)
+    alive = np.arange(len(guess_indices))
+    m = min(sample_size, n)
+    cells, rounds = 0, 0
+    while True:
+        rounds += 1
+        counts = batched_histograms(table, guess_indices[alive], candidate_indices[order[:m]], workers, n_patterns)
+        cells += len(alive) * m
+        if m >= n:
+            estimate, error = entropy_from_counts(counts), np.zeros(len(alive))
+        else:
+            estimate, error = entropy_estimates(counts, n)
+        lead = int(np.argmax(estimate))
+        keep = estimate + z * error >= estimate[lead] - z * error[lead]
+        alive, estimate = alive[keep], estimate[keep]
+        if len(alive) == 1 or m >= n:
+            break
+        m = min(2 * m, n)
+    pick = np.lexsort((~prefer[alive], -estimate))[0]
+    return int(guess_indices[alive[pick]]), float(estimate[pick]), cells, rounds
@@ -76,6 +76,10 @@ class StatsLogger:
             "BFS": "E2EFDA",
             "DFS": "FCE4D6",
             "A*": "DDEBF7",
+            "IDA*": "D9E1F2",
+            "Minimax": "EDEDED",
+            "Optimal": "E4DFEC",
+            "MCTS": "DDEBDA",
             "Entropy": "FFF2CC"
         }
         algo_cell = ws.cell(last_row, algo_col)
@@ -0,0 +1,168 @@
+import os
+import sys
+import time
+import pickle
+import numpy as np
+from multiprocessing import Pool, cpu_count
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Search_Algorithm.pattern_data import find_artifact, entropy_from_counts
+from Search_Algorithm.pattern_rows import LazyPatternTable, BlockPatternTable, group_by_block, pattern_dtype, locality_order
+
+TILED_FILE = "pattern_tiles.npy"
+TILED_META = "pattern_tiles.pkl"
+# Tile side: one tile is TILE x TILE pattern ids, stored contiguously on disk
+TILE = 1024
+
+_cache_tiled = {}
+
+# Build workers: each computes one row block and writes its tiles in place
+worker_rows = None
+worker_tiles = None
+
+
+class TiledPatternTable(BlockPatternTable):
+    """Pattern table [guesses x answers] kept on disk as a memory-mapped grid of tiles.
+
+    Reads use the same indexing as the dense table and only touch the tiles that
+    hold the requested rows and columns. histograms() streams the tiles one at a
+    time, so scoring a candidate set never holds more than one tile block.
+    """
+
+    def __init__(self, path, shape, tile, big_endian=False):
+        self.tiles = np.load(path, mmap_mode="r")
+        self.shape = tuple(shape)
+        self.dtype = self.tiles.dtype
+        self.tile = tile
+        self.big_endian = big_endian
+        self.tiles_read = 0
+
+    @property
+    def nbytes(self):
+        return self.tiles.nbytes
+
+    def _read(self, guess_indices, answer_indices):
+        guess_indices = np.asarray(guess_indices, dtype=np.intp)
+        answer_indices = np.asarray(answer_indices, dtype=np.intp)
+        out = np.empty((len(guess_indices), len(answer_indices)), dtype=self.dtype)
+        column_groups = list(group_by_block(answer_indices, self.tile))
+        for rb, g_pos in group_by_block(guess_indices, self.tile):
+            local_rows = guess_indices[g_pos] - rb * self.tile
+            for cb, c_pos in column_groups:
+                local_cols = answer_indices[c_pos] - cb * self.tile
+                out[np.ix_(g_pos, c_pos)] = self.tiles[rb, cb][np.ix_(local_rows, local_cols)]
+                self.tiles_read += 1
+        return out
+
+    def histograms(self, guess_indices, candidate_indices, n_patterns=243):
+        """Pattern counts [guesses x n_patterns], accumulated tile by tile."""
+        guess_indices = np.asarray(guess_indices, dtype=np.intp)
+        candidate_indices = np.asarray(candidate_indices, dtype=np.intp)
+        counts = np.zeros((len(guess_indices), n_patterns), dtype=np.int64)
+        column_groups = list(group_by_block(candidate_indices, self.tile))
+        for rb, g_pos in group_by_block(guess_indices, self.tile):
+            local_rows = guess_indices[g_pos] - rb * self.tile
+            offsets = np.arange(len(g_pos), dtype=np.intp)[:, None] * n_patterns
+            block_counts = np.zeros(len(g_pos) * n_patterns, dtype=np.int64)
+            for cb, c_pos in column_groups:
+                local_cols = candidate_indices[c_pos] - cb * self.tile
+                patterns = self.tiles[rb, cb][np.ix_(local_rows, local_cols)].astype(np.intp)
+                block_counts += np.bincount((patterns + offsets).ravel(), minlength=len(block_counts))
+                self.tiles_read += 1
+            counts[g_pos] = block_counts.reshape(len(g_pos), n_patterns)
+        return counts
+
+
+def init_build_worker(guesses, answers, path, big_endian):
+    global worker_rows, worker_tiles
+    worker_rows = LazyPatternTable(guesses, answers, cache_bytes=0, big_endian=big_endian)
+    worker_tiles = np.load(path, mmap_mode="r+")
+
+
+def build_row_block(rb):
+    """Compute one row block, write its tiles and return the static entropy of its rows."""
+    tile = worker_tiles.shape[2]
+    rows = worker_rows.rows(np.arange(rb * tile, min((rb + 1) * tile, worker_rows.shape[0])), cache=False)
+    for cb in range(worker_tiles.shape[1]):
+        block = rows[:, cb * tile:(cb + 1) * tile]
+        worker_tiles[rb, cb, :block.shape[0], :block.shape[1]] = block
+    worker_tiles.flush()
+    n_patterns = 3 ** worker_rows.guess_codes.shape[1]
+    keys = rows.astype(np.intp) + np.arange(len(rows), dtype=np.intp)[:, None] * n_patterns
+    counts = np.bincount(keys.ravel(), minlength=len(rows) * n_patterns).reshape(len(rows), n_patterns)
+    return rb, entropy_from_counts(counts)
+
+
+def build_tiled_matrix(words, answers=None, path=TILED_FILE, meta_path=TILED_META, tile=TILE, big_endian=False,
+                       workers=0, locality=False):
+    """Write the tiled table of words x answers block by block, plus its metadata pickle.
+
+    Only one row block per worker is in memory at a time, so the build works for
+    dictionaries whose dense table would not fit in RAM. With locality both axes
+    are stored in locality_order.
+    """
+    square = answers is None or answers is words
+    words = [w.upper() for w in words]
+    answers = words if square else [w.upper() for w in answers]
+    if locality:
+        words = [words[i] for i in locality_order(words)]
+        answers = words if square else [answers[i] for i in locality_order(answers)]
+    n_blocks = (-(-len(words) // tile), -(-len(answers) // tile))
+    tiles = np.lib.format.open_memmap(path, mode="w+", dtype=pattern_dtype(len(words[0])),
+                                      shape=n_blocks + (tile, tile))
+    del tiles
+    static_entropy = np.zeros(len(words))
+    initargs = (words, None if square else answers, path, big_endian)
+    with Pool(processes=workers or cpu_count(), initializer=init_build_worker, initargs=initargs) as pool:
+        for count, (rb, entropy) in enumerate(pool.imap_unordered(build_row_block, range(n_blocks[0])), 1):
+            static_entropy[rb * tile:rb * tile + len(entropy)] = entropy
+            print(f"Progress: {count}/{n_blocks[0]} row blocks", end='\r')
+    meta = {
+        "tiles_file": os.path.basename(path),
+        "shape": (len(words), len(answers)),
+        "tile": tile,
+        "big_endian": big_endian,
+        "full_dictionary": words,
+        "answers": answers,
+        "static_entropy": static_entropy,
+    }
+    with open(meta_path, "wb") as f:
+        pickle.dump(meta, f)
+    return meta
+
+
+def load_tiled_data(meta_path=TILED_META):
+    """Data pack over the tiled artifact, shaped like static_entropy.pkl. None if it is missing."""
+    found = find_artifact(meta_path)
+    if found is None:
+        return None
+    if found not in _cache_tiled:
+        with open(found, 'rb') as f:
+            meta = pickle.load(f)
+        tiles_path = os.path.join(os.path.dirname(found), meta["tiles_file"])
+        table = TiledPatternTable(tiles_path, meta["shape"], meta["tile"], meta["big_endian"])
+        words, answers = meta["full_dictionary"], meta["answers"]
+        word_to_idx = {w: i for i, w in enumerate(words)}
+        _cache_tiled[found] = {
+            "pattern_table": table,
+            "static_entropy": meta["static_entropy"],
+            "entropy_map": dict(zip(words, meta["static_entropy"].tolist())),
+            "full_dictionary": words,
+            "word_to_idx": word_to_idx,
+            "answers": answers,
+            "answer_rows": np.array([word_to_idx[w] for w in answers]),
+        }
+    return _cache_tiled[found]
+
+
+if __name__ == "__main__":
+    from words_api import Words
+    # python tiled_matrix.py [word file] [word length] [--locality]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    word_file = args[0] if args else None
+    size = int(args[1]) if len(args) > 1 else 5
+    api = Words(size, word_file)
+    print(f"🚀 Building tiled pattern table: {len(api.words_list)} guesses x {len(api.answers_list)} answers...")
+    t0 = time.time()
+    build_tiled_matrix(api.words_list, api.answers_list, locality="--locality" in sys.argv)
+    print(f"\n✅ Done in {time.time()-t0:.2f}s. Saved {TILED_FILE} ({os.path.getsize(TILED_FILE) / 2**20:.1f} MB) and {TILED_META}")
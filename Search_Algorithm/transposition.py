@@ -0,0 +1,94 @@
+from collections import OrderedDict
+import numpy as np
+
+_zobrist_cache = {}
+
+
+def zobrist_keys(size, seed=2024):
+    """One random 64-bit key per dictionary index, cached per dictionary size."""
+    keys = _zobrist_cache.get((size, seed))
+    if keys is None:
+        rng = np.random.default_rng(seed)
+        keys = rng.integers(0, np.iinfo(np.uint64).max, size=size, dtype=np.uint64, endpoint=True)
+        _zobrist_cache[(size, seed)] = keys
+    return keys
+
+
+def candidate_fingerprint(candidate_indices, keys):
+    # XOR of per-word keys is order independent, so the same set reached through
+    # different guess orders gets the same fingerprint. The size guards against
+    # the rare XOR collision between sets of different sizes.
+    if len(candidate_indices) == 0:
+        return (0, 0)
+    return (int(np.bitwise_xor.reduce(keys[candidate_indices])), len(candidate_indices))
+
+
+class TranspositionTable:
+    """Bounded LRU table of search results keyed by candidate-set fingerprint.
+
+    An entry either proves that the set cannot be solved within `remaining`
+    guesses, or stores a solution suffix found for it.
+    """
+    FAILED = 0
+    SOLVED = 1
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def probe(self, fingerprint, remaining):
+        """Return the stored entry if it settles a search with `remaining` guesses left."""
+        self.probes += 1
+        entry = self.entries.get(fingerprint)
+        if entry is None:
+            return None
+        flag, depth, _ = entry
+        # A failure proven with more guesses left also holds with fewer;
+        # a stored solution is reusable when it fits in what is left.
+        if (flag == self.FAILED and remaining <= depth) or (flag == self.SOLVED and depth <= remaining):
+            self.entries.move_to_end(fingerprint)
+            self.hits += 1
+            return entry
+        return None
+
+    def store_failure(self, fingerprint, remaining):
+        entry = self.entries.get(fingerprint)
+        if entry is not None and entry[0] == self.FAILED and entry[1] >= remaining:
+            return
+        if entry is not None and entry[0] == self.SOLVED:
+            return
+        self._store(fingerprint, (self.FAILED, remaining, None))
+
+    def store_solution(self, fingerprint, suffix, depth=None):
+        """Record that the set is solved in `depth` guesses (len(suffix) by default).
+
+        Searches that only keep the next move can store a one-item suffix
+        together with the full depth.
+        """
+        depth = len(suffix) if depth is None else depth
+        entry = self.entries.get(fingerprint)
+        if entry is not None and entry[0] == self.SOLVED and entry[1] <= depth:
+            return
+        self._store(fingerprint, (self.SOLVED, depth, list(suffix)))
+
+    def _store(self, fingerprint, entry):
+        self.entries[fingerprint] = entry
+        self.entries.move_to_end(fingerprint)
+        self.stores += 1
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def clear(self):
+        self.entries.clear()
+        self.probes = self.hits = self.stores = self.evictions = 0
@@ -22,7 +22,9 @@ class TestResults:
         self.all_results = []  
         self.memory_usages = []  
         self.peak_memory = 0  
-    def add_result(self, word, guesses, time_taken, expanded, won, memory_mb=0):
+        self.index_bytes = []
+        self.wide_index_bytes = []
+    def add_result(self, word, guesses, time_taken, expanded, won, memory_mb=0, index_bytes=0, wide_index_bytes=0):
         self.total_tests += 1
         if won and guesses <= 6:
             self.wins += 1
@@ -36,6 +38,13 @@ class TestResults:
         self.all_results.append((word, guesses))
         self.memory_usages.append(memory_mb)
         self.peak_memory = max(self.peak_memory, memory_mb)
+        self.index_bytes.append(index_bytes)
+        self.wide_index_bytes.append(wide_index_bytes)
+    def index_savings(self):
+        """(compact KB/game, int64 KB/game, saved fraction) of the index arrays passed to table reads."""
+        compact = statistics.mean(self.index_bytes) / 1024
+        wide = statistics.mean(self.wide_index_bytes) / 1024
+        return compact, wide, (1 - compact / wide) if wide else 0.0
     def print_report(self):
         print("\n" + "="*70)
         print("ENTROPY MATRIX SOLVER - BENCHMARK REPORT")
@@ -82,6 +91,11 @@ class TestResults:
         print(f"{'Peak Memory:':<25} {self.peak_memory:.2f} MB")
         print(f"{'Average Memory:':<25} {statistics.mean(self.memory_usages):.2f} MB")
         print(f"{'Median Memory:':<25} {statistics.median(self.memory_usages):.2f} MB")
+        compact, wide, saved = self.index_savings()
+        print(f"\nINDEX BANDWIDTH (per game)")
+        print(f"{'Compact Indices:':<25} {compact:.2f} KB")
+        print(f"{'As int64:':<25} {wide:.2f} KB")
+        print(f"{'Saved:':<25} {saved:.1%}")
         long_solves = [(guesses, word) for word, guesses in self.all_results if guesses > 6]
         if long_solves:
             long_solves.sort(reverse=True)
@@ -140,6 +154,11 @@ class TestResults:
             f.write(f"Peak Memory: {self.peak_memory:.2f} MB\n")
             f.write(f"Average Memory: {statistics.mean(self.memory_usages):.2f} MB\n")
             f.write(f"Median Memory: {statistics.median(self.memory_usages):.2f} MB\n\n")
+            compact, wide, saved = self.index_savings()
+            f.write("INDEX BANDWIDTH (per game)\n")
+            f.write(f"Compact Indices: {compact:.2f} KB\n")
+            f.write(f"As int64: {wide:.2f} KB\n")
+            f.write(f"Saved: {saved:.1%}\n\n")
             long_solves = [(guesses, word) for word, guesses in self.all_results if guesses > 6]
             if long_solves:
                 long_solves.sort(reverse=True)
@@ -151,9 +170,9 @@ class TestResults:
         print(f"\n✅ Results saved to: {filepath}")
 
 
-def run_benchmark(num_tests=100, word_size=5, use_random_sample=True, hard_mode=True):
+def run_benchmark(num_tests=100, word_size=5, use_random_sample=True, hard_mode=True, lookahead=False):
     print(f"Starting Entropy Matrix Benchmark: {num_tests} tests on {word_size}-letter words")
-    print(f"Mode: {'Hard Mode' if hard_mode else 'Normal Mode'}")
+    print(f"Mode: {'Hard Mode' if hard_mode else 'Normal Mode'}{' + 2-ply lookahead' if lookahead else ''}")
     print("="*70)
     
     
@@ -187,7 +206,7 @@ def run_benchmark(num_tests=100, word_size=5, use_random_sample=True, hard_mode=
     for i, target_word in enumerate(test_words, 1):
         test_api = Words(word_size)
         test_api.word = target_word
-        solver = EntropySolver(test_api)
+        solver = EntropySolver(test_api, lookahead=lookahead)
         gc.collect()  
         mem_before = process.memory_info().rss / 1024 / 1024
         try:
@@ -195,11 +214,12 @@ def run_benchmark(num_tests=100, word_size=5, use_random_sample=True, hard_mode=
             mem_after = process.memory_info().rss / 1024 / 1024  
             memory_used = mem_after - baseline_memory  
             stats = solver.get_stats()
-            guesses = stats["Guesses"]
+            guesses = stats["Total Guesses"]
             time_taken = float(stats["Time"].replace('s', ''))
             expanded = stats["Expanded Nodes"]
-            won = stats["Result"] == "Win"
-            results.add_result(target_word, guesses, time_taken, expanded, won, memory_used)
+            won = stats["Status"] == "Win"
+            results.add_result(target_word, guesses, time_taken, expanded, won, memory_used,
+                               stats["Index Bytes"], stats["Index Bytes (int64)"])
             if i % 10 == 0:
                 avg_time = statistics.mean(results.times)
                 avg_guesses = statistics.mean(results.guess_counts)
@@ -117,6 +117,17 @@ def test_astar_single(target_word=None):
         }
 
 
+def test_astar_memory_budget(target_word="CRANE", memory_budget=200_000):
+    """A* under a small byte budget must stay within it and still solve"""
+    word_api = TestWordAPI(5, target_word)
+    solver = AStarSolver(word_api, memory_budget=memory_budget)
+    path = solver.solve()
+
+    assert path and path[-1].upper() == word_api.word
+    assert solver.evicted_states > 0
+    assert solver._live_bytes <= solver.memory_budget
+
+
 def run_astar_tests(num_tests=1000):
     """Run A* tests multiple times"""
     print(f"\n{'='*70}")
@@ -268,6 +268,57 @@ def compare_dfs_vs_ucs(goal_word, word_size=5):
     }
 
 
+def compare_dfs_modes(goal_words, word_size=5, start_word="SLATE"):
+    """
+    So sánh các chế độ DFS (thứ tự duyệt + iterative deepening) trên nhiều goal words.
+    
+    Args:
+        goal_words: Danh sách các goal words cần test
+        word_size: Độ dài từ
+        start_word: Từ bắt đầu cố định để các chế độ dùng chung một nhánh gốc
+    
+    Returns:
+        dict: {tên chế độ: {'steps': trung bình số bước, 'nodes': trung bình nodes, 'time': tổng thời gian}}
+    """
+    modes = [
+        ("dictionary", False),
+        ("static", False),
+        ("live", False),
+        ("static", True),
+        ("live", True),
+    ]
+    summary = {}
+    
+    for ordering, deepening in modes:
+        name = f"{ordering}{'+ID' if deepening else ''}"
+        steps, nodes, total_time = [], [], 0.0
+        for goal in goal_words:
+            word_api = TestWordAPI(word_size, goal)
+            solver = DFSSolver(word_api, move_ordering=ordering, iterative_deepening=deepening)
+            feedback = solver._calculate_feedback(start_word.upper(), word_api.word)
+            board_state = [(start_word.upper(), list(feedback))]
+            
+            start = time.time()
+            solver.solve(board_state)
+            total_time += time.time() - start
+            steps.append(solver.total_guesses)
+            nodes.append(solver.expanded_nodes)
+        summary[name] = {
+            'steps': sum(steps) / len(steps),
+            'nodes': sum(nodes) / len(nodes),
+            'time': round(total_time, 4)
+        }
+    
+    print("\n" + "="*60)
+    print(f"{'Mode':<16} {'Avg Steps':<12} {'Avg Nodes':<12} {'Time':<10}")
+    print("-"*60)
+    for name, r in summary.items():
+        print(f"{name:<16} {r['steps']:<12.2f} {r['nodes']:<12.2f} {r['time']:<10}s")
+    print("="*60)
+    
+    return summary
+
+
 # ============================================================================
 # EXAMPLES - Các ví dụ sử dụng
 # ============================================================================
@@ -319,6 +370,12 @@ if __name__ == "__main__":
     # print("\n📝 Example 6: So sánh DFS vs UCS")
     # comparison = compare_dfs_vs_ucs("BRAIN")
     
+    # # -------------------------------------------------------------------------
+    # # Example 6b: So sánh thứ tự duyệt entropy và iterative deepening
+    # # -------------------------------------------------------------------------
+    # print("\n📝 Example 6b: So sánh các chế độ DFS")
+    # modes = compare_dfs_modes(["SHAKE", "CRANE", "NIGHT", "BREAD", "SWIMS"])
+    
     # # -------------------------------------------------------------------------
     # # Example 7: Tự tạo test case của bạn
     # # -------------------------------------------------------------------------
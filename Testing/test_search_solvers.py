@@ -0,0 +1,226 @@
+# test_search_solvers.py - Test nhỏ, tất định cho các solver tìm kiếm
+"""
+Chạy các solver trên một danh sách từ nhỏ cố định, với bảng pattern tính trực
+tiếp (matrix_free) nên không cần static_entropy.pkl, và so kết quả với vét cạn.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import contextlib
+from functools import lru_cache
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Search_Algorithm.compressed_matrix import build_compressed_matrix, CompressedPatternTable
+from Search_Algorithm.idastar import IDAStarSolver
+from Search_Algorithm.mcts import MCTSSolver
+from Search_Algorithm.minimax import MinimaxSolver
+from Search_Algorithm.optimal import OptimalSolver
+from Search_Algorithm.pattern_data import feedback_to_pid, pattern_histograms
+from Search_Algorithm.pattern_rows import feedback_block, letter_codes
+from Search_Algorithm.tiled_matrix import build_tiled_matrix, TiledPatternTable
+from Search_Algorithm.transposition import TranspositionTable, zobrist_keys, candidate_fingerprint
+from words_api import Words
+
+# Opener of the solvers first, then families that share most of their letters
+TOY_WORDS = ["SALET", "CRANE", "TRACE", "CRATE", "REACT", "CATER", "GRATE", "GRACE", "BRACE", "PLACE",
+             "SPACE", "SLATE", "STALE", "STEAL", "LEAST", "TALES", "BAKER", "MAKER", "TAKER", "WAKER",
+             "FAKER", "CAKED", "BAKED", "FAKED"]
+
+
+class ToyWordAPI:
+    """Word API over TOY_WORDS with a fixed goal word."""
+
+    def __init__(self, goal="CRANE"):
+        self.words_list = TOY_WORDS
+        self.word = goal
+
+    def is_valid_guess(self, guess):
+        return guess == self.word
+
+    def is_in_dictionary(self, word):
+        return word in self.words_list
+
+
+def quiet(make):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return make()
+
+
+def brute_force_worst_case(table, win, candidates):
+    """Fewest guesses that find every answer of the set, trying every guess at every set."""
+    @lru_cache(maxsize=None)
+    def worst(cands):
+        if len(cands) == 1:
+            return 1
+        best = float("inf")
+        for guess in range(table.shape[0]):
+            row = table[guess, list(cands)].tolist()
+            if len(set(row)) == 1 and row[0] != win:
+                continue
+            buckets = {pid: tuple(c for c, p in zip(cands, row) if p == pid) for pid in set(row)}
+            best = min(best, max(1 if pid == win else 1 + worst(b) for pid, b in buckets.items()))
+        return best
+    return worst(tuple(int(c) for c in candidates))
+
+
+def brute_force_total_cost(table, win, candidates, pool):
+    """Fewest guesses summed over every answer of the set, trying each guess of the pool at every set."""
+    @lru_cache(maxsize=None)
+    def total(cands):
+        if len(cands) == 1:
+            return 1
+        best = float("inf")
+        for guess in pool:
+            row = table[guess, list(cands)].tolist()
+            if len(set(row)) == 1 and row[0] != win:
+                continue
+            buckets = {pid: tuple(c for c, p in zip(cands, row) if p == pid) for pid in set(row)}
+            best = min(best, len(cands) + sum(total(b) for pid, b in buckets.items() if pid != win))
+        return best
+    return total(tuple(int(c) for c in candidates))
+
+
+def string_feedback(guess, secret):
+    """Pattern id of the original string feedback (Words.get_feedback)."""
+    api = Words.__new__(Words)
+    api.word = secret
+    return feedback_to_pid(api.get_feedback(guess))
+
+
+def check_stored_table(table, words, answers):
+    """Reads and histograms of a stored table match feedback_block and the string feedback."""
+    expected = feedback_block(letter_codes(words), letter_codes(answers))
+    assert table.shape == expected.shape
+    for g, guess in enumerate(words):
+        for a, answer in enumerate(answers):
+            assert table[g, a] == expected[g, a] == string_feedback(guess, answer)
+    guesses = np.arange(len(words))
+    candidates = np.arange(len(answers))[::2]
+    assert np.array_equal(table[np.ix_(guesses, candidates)], expected[np.ix_(guesses, candidates)])
+    assert np.array_equal(pattern_histograms(table, guesses, candidates), pattern_histograms(expected, guesses, candidates))
+
+
+def test_transposition_probe_semantics():
+    """A failure settles searches with as many guesses left or fewer, a solution those with as many or more"""
+    keys = zobrist_keys(len(TOY_WORDS))
+    failed = candidate_fingerprint([1, 2, 3], keys)
+    solved = candidate_fingerprint([4, 5], keys)
+    assert candidate_fingerprint([3, 1, 2], keys) == failed
+    assert candidate_fingerprint([1, 2], keys) != failed
+
+    tt = TranspositionTable(max_entries=2)
+    tt.store_failure(failed, 3)
+    tt.store_solution(solved, [4], depth=2)
+    assert tt.probe(failed, 3)[0] == TranspositionTable.FAILED
+    assert tt.probe(failed, 1)[0] == TranspositionTable.FAILED
+    assert tt.probe(failed, 4) is None
+    assert tt.probe(solved, 2) == (TranspositionTable.SOLVED, 2, [4])
+    assert tt.probe(solved, 5)[0] == TranspositionTable.SOLVED
+    assert tt.probe(solved, 1) is None
+    assert (tt.probes, tt.hits) == (6, 4)
+
+    # A weaker failure or a longer solution never replaces what is stored
+    tt.store_failure(failed, 2)
+    tt.store_solution(solved, [5], depth=3)
+    assert tt.entries[failed] == (TranspositionTable.FAILED, 3, None)
+    assert tt.entries[solved] == (TranspositionTable.SOLVED, 2, [4])
+    # A solution overrides a failure, and a failure never overrides a solution
+    tt.store_solution(failed, [1], depth=4)
+    tt.store_failure(failed, 5)
+    assert tt.probe(failed, 4)[0] == TranspositionTable.SOLVED
+
+    # Bounded LRU: a probe hit refreshes an entry, the oldest one goes first
+    tt.probe(solved, 2)
+    tt.store_failure(candidate_fingerprint([6, 7, 8], keys), 2)
+    assert failed not in tt.entries and solved in tt.entries
+    assert tt.evictions == 1
+
+
+def test_idastar_threshold_is_minimal():
+    """IDA* proves a threshold on the whole toy set, equal to the brute-force worst case"""
+    solver = quiet(lambda: IDAStarSolver(ToyWordAPI(), matrix_free=True))
+    candidates = solver.candidates_indices
+    guess_idx = quiet(lambda: solver._plan_guess(candidates))
+
+    assert solver.plan_costs[-1] is not None
+    assert solver.proven_turns == 1
+    assert solver.plan_costs[-1] == brute_force_worst_case(solver.table, solver.win_pid, candidates)
+    assert 0 <= guess_idx < len(TOY_WORDS)
+
+
+def test_minimax_worst_case_is_proven():
+    """Minimax guarantees the brute-force worst case of the toy set, and plays the game within it"""
+    solver = MinimaxSolver(ToyWordAPI("FAKED"), matrix_free=True)
+    candidates = solver.candidates_indices
+    value, guess_idx = solver._best_guess(candidates, solver.MAX_GUESSES)
+
+    assert value == brute_force_worst_case(solver.table, solver.win, candidates)
+    assert solver.search.evaluate_guess(candidates, guess_idx, value) == value
+    # Nothing fits one guess less
+    assert solver._best_guess(candidates, value - 1) == (None, -1)
+
+    path = solver.solve()
+    assert path[-1] == "FAKED"
+    assert len(path) <= solver.guarantee
+
+
+def test_optimal_expected_cost_is_exact():
+    """Optimal's total cost matches brute force over the whole toy list, and the probes only improve on the candidates"""
+    full = quiet(lambda: OptimalSolver(ToyWordAPI(), full_pool=True, matrix_free=True))
+    candidates = full.candidates_indices
+    everything = range(full.table.shape[0])
+    value, guess_idx = full._best_guess(candidates)
+    assert value == brute_force_total_cost(full.table, full.win, candidates, everything)
+    assert full.search.evaluate_guess(candidates, guess_idx, 0, float("inf")) == value
+
+    solver = quiet(lambda: OptimalSolver(ToyWordAPI("CAKED"), matrix_free=True))
+    live_value, _ = solver._best_guess(candidates)
+    assert value <= live_value <= solver.search.total_cost(candidates)[0]
+
+    path = solver.solve()
+    assert path[-1] == "CAKED"
+    assert solver.get_stats()["Status"] == "Win"
+
+
+def test_mcts_plays_legal_guesses():
+    """MCTS only plays dictionary words, and ends every toy game at the goal within six guesses"""
+    for goal in TOY_WORDS:
+        solver = quiet(lambda: MCTSSolver(ToyWordAPI(goal), time_budget_ms=10, seed=0, matrix_free=True))
+        path = solver.solve(max_turns=6)
+        assert all(word in TOY_WORDS for word in path)
+        assert path[-1] == goal
+
+
+def test_stored_tables_match_feedback():
+    """Compressed blocks and tiles smaller than the word list read back the patterns of the kernel"""
+    # Repeated letters exercise the yellow rule
+    words = TOY_WORDS + ["SPEED", "EERIE", "ERASE", "ABBEY", "LLAMA"]
+    answers = words[::3]
+    with tempfile.TemporaryDirectory() as tmp:
+        for guesses, targets in ((words, None), (words, answers)):
+            path = os.path.join(tmp, "blocks.bin")
+            quiet(lambda: build_compressed_matrix(guesses, targets, path=path, rows_per_block=4))
+            table = CompressedPatternTable(path)
+            check_stored_table(table, guesses, targets or guesses)
+            assert len(table.offsets) - 1 == -(-len(guesses) // 4)
+            table._file.close()
+
+            path, meta_path = os.path.join(tmp, "tiles.npy"), os.path.join(tmp, "tiles.pkl")
+            meta = quiet(lambda: build_tiled_matrix(guesses, targets, path=path, meta_path=meta_path, tile=8,
+                                                    workers=1))
+            table = TiledPatternTable(path, meta["shape"], meta["tile"])
+            assert table.tiles.shape[:2] == (-(-len(guesses) // 8), -(-len(targets or guesses) // 8))
+            check_stored_table(table, guesses, targets or guesses)
+            del table
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -8,6 +8,10 @@ import sqlite3
 import time
 from tkinter import messagebox
 from Search_Algorithm.astar import AStarSolver
+from Search_Algorithm.idastar import IDAStarSolver
+from Search_Algorithm.minimax import MinimaxSolver
+from Search_Algorithm.optimal import OptimalSolver
+from Search_Algorithm.mcts import MCTSSolver
 from Search_Algorithm.dfs import DFSSolver
 from Search_Algorithm.bfs import BFSSolver
 from Search_Algorithm.entropy_best_first import EntropySolver
@@ -506,6 +510,14 @@ class Wordle:
             self.solve_entropy()
         elif self.solve_method == "A*":
             self.solve_astar()
+        elif self.solve_method == "IDA*":
+            self.solve_idastar()
+        elif self.solve_method == "Minimax":
+            self.solve_minimax()
+        elif self.solve_method == "Optimal":
+            self.solve_optimal()
+        elif self.solve_method == "MCTS":
+            self.solve_mcts()
         else:
             print("Unknown solve method:", self.solve_method)
             return
@@ -664,6 +676,70 @@ class Wordle:
         )
         self._animate_solution(solution, solver)
 
+    def solve_idastar(self):
+        board_state = [(guess.upper(), feedback) for guess, feedback in self._get_board_state()]
+        solver = IDAStarSolver(self.word_api)
+        solution = solver.solve(board_state)
+
+        stats = solver.get_stats()
+        StatsLogger.print_stats("IDA*", stats)
+        StatsLogger.save_run(
+            algorithm_name="IDA*",
+            stats_dict=stats,
+            solution_path=solver.guesses_history,
+            target_word=self.word_api.word.upper(),
+            word_length=self.word_size
+        )
+        self._animate_solution(solution, solver)
+
+    def solve_minimax(self):
+        board_state = [(guess.upper(), feedback) for guess, feedback in self._get_board_state()]
+        solver = MinimaxSolver(self.word_api)
+        solution = solver.solve(board_state)
+
+        stats = solver.get_stats()
+        StatsLogger.print_stats("Minimax", stats)
+        StatsLogger.save_run(
+            algorithm_name="Minimax",
+            stats_dict=stats,
+            solution_path=solver.guesses_history,
+            target_word=self.word_api.word.upper(),
+            word_length=self.word_size
+        )
+        self._animate_solution(solution, solver)
+
+    def solve_optimal(self):
+        board_state = [(guess.upper(), feedback) for guess, feedback in self._get_board_state()]
+        solver = OptimalSolver(self.word_api)
+        solution = solver.solve(board_state)
+
+        stats = solver.get_stats()
+        StatsLogger.print_stats("Optimal", stats)
+        StatsLogger.save_run(
+            algorithm_name="Optimal",
+            stats_dict=stats,
+            solution_path=solver.guesses_history,
+            target_word=self.word_api.word.upper(),
+            word_length=self.word_size
+        )
+        self._animate_solution(solution, solver)
+
+    def solve_mcts(self):
+        board_state = [(guess.upper(), feedback) for guess, feedback in self._get_board_state()]
+        solver = MCTSSolver(self.word_api)
+        solution = solver.solve(board_state)
+
+        stats = solver.get_stats()
+        StatsLogger.print_stats("MCTS", stats)
+        StatsLogger.save_run(
+            algorithm_name="MCTS",
+            stats_dict=stats,
+            solution_path=solver.guesses_history,
+            target_word=self.word_api.word.upper(),
+            word_length=self.word_size
+        )
+        self._animate_solution(solution, solver)
+
     def solve_entropy(self):
         # --- 1. Tạo trạng thái bàn cờ từ giao diện (Parsing Board State) ---
         board_state = []
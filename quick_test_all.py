@@ -4,6 +4,10 @@ sys.path.append('./Testing')
 from test_dfs_detailed import TestWordAPI
 from Search_Algorithm.dfs import DFSSolver
 from Search_Algorithm.astar import AStarSolver
+from Search_Algorithm.idastar import IDAStarSolver
+from Search_Algorithm.minimax import MinimaxSolver
+from Search_Algorithm.optimal import OptimalSolver
+from Search_Algorithm.mcts import MCTSSolver
 from Search_Algorithm.entropy_best_first import EntropySolver
 
 test_words = ['SLATE', 'CRANE']
@@ -28,6 +32,46 @@ for word in test_words:
     stats = solver.get_stats()
     print(f"{word}: Memory={stats['Memory Usage']}, Nodes={stats['Expanded Nodes']}")
 
+print("\n" + "="*60)
+print("IDA* MEMORY TEST")
+print("="*60)
+for word in test_words:
+    api = TestWordAPI(5, word)
+    solver = IDAStarSolver(api)
+    result = solver.solve(board_state=[], max_turns=6)
+    stats = solver.get_stats()
+    print(f"{word}: Memory={stats['Memory Usage']}, Nodes={stats['Expanded Nodes']}, Re-expansions={stats['Re-expansions']}")
+
+print("\n" + "="*60)
+print("MINIMAX MEMORY TEST")
+print("="*60)
+for word in test_words:
+    api = TestWordAPI(5, word)
+    solver = MinimaxSolver(api)
+    result = solver.solve(board_state=[], max_turns=6)
+    stats = solver.get_stats()
+    print(f"{word}: Memory={stats['Memory Usage']}, Nodes={stats['Expanded Nodes']}, Guaranteed Within={stats['Guaranteed Within']}")
+
+print("\n" + "="*60)
+print("OPTIMAL MEMORY TEST")
+print("="*60)
+for word in test_words:
+    api = TestWordAPI(5, word)
+    solver = OptimalSolver(api)
+    result = solver.solve(board_state=[], max_turns=6)
+    stats = solver.get_stats()
+    print(f"{word}: Memory={stats['Memory Usage']}, Nodes={stats['Expanded Nodes']}, Expected Guesses={stats['Expected Guesses']}")
+
+print("\n" + "="*60)
+print("MCTS MEMORY TEST")
+print("="*60)
+for word in test_words:
+    api = TestWordAPI(5, word)
+    solver = MCTSSolver(api, time_budget_ms=200)
+    result = solver.solve(board_state=[], max_turns=6)
+    stats = solver.get_stats()
+    print(f"{word}: Memory={stats['Memory Usage']}, Nodes={stats['Expanded Nodes']}, Rollouts={stats['Rollouts']}")
+
 print("\n" + "="*60)
 print("ENTROPY MEMORY TEST")
 print("="*60)
@@ -6,7 +6,7 @@ from tkinter import messagebox
 
 class Settings:
     BG = "#171717"
-    SOLVE_METHODS = ["BFS", "DFS", "Entropy", "A*"]
+    SOLVE_METHODS = ["BFS", "DFS", "Entropy", "A*", "IDA*", "Minimax", "Optimal", "MCTS"]
 
     def __init__(self, functions):
         self.functions = functions
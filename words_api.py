@@ -2,9 +2,12 @@ import random
 import os
 
 class Words:
-    def __init__(self, size):
+    def __init__(self, size, word_file=None):
         self.size = size
+        # Optional path to any word list; the bundled file for `size` otherwise
+        self.word_file = word_file
         self.words_list = []
+        self.answers_list = []
         self.used_words = []
         self.word = ""
 
@@ -24,11 +27,26 @@ class Words:
         # Tìm đường dẫn tuyệt đối đến thư mục gốc của project
         base_dir = os.path.dirname(os.path.abspath(__file__))
         file_path = os.path.join(base_dir, "word_files", f"{file_name}.txt")
+        if self.word_file:
+            file_path = self.word_file
         
         with open(file_path, 'r') as file:
             self.words_list = file.readlines()
 
         self.words_list = [word.strip().upper() for word in self.words_list]
+        # Lists may mix lengths (six_letters.txt has a 5-letter entry), repeat words or carry stray lines
+        self.words_list = list(dict.fromkeys(w for w in self.words_list if len(w) == self.size and w.isalpha()))
+
+        # Optional curated answers, e.g. five_letters_answers.txt: secrets are drawn
+        # from it while every word of the main file stays a valid guess
+        answers_path = os.path.splitext(file_path)[0] + "_answers.txt"
+        if os.path.exists(answers_path):
+            with open(answers_path, 'r') as file:
+                self.answers_list = [word.strip().upper() for word in file if len(word.strip()) == self.size]
+            allowed = set(self.words_list)
+            self.words_list += [word for word in self.answers_list if word not in allowed]
+        else:
+            self.answers_list = self.words_list
 
 
     def is_at_right_position(self, i, char):
@@ -47,9 +65,9 @@ class Words:
         return False
 
     def select_word(self):
-        self.word = random.choice(self.words_list).upper()
+        self.word = random.choice(self.answers_list).upper()
         while self.word in self.used_words:
-            self.word = random.choice(self.words_list).upper()
+            self.word = random.choice(self.answers_list).upper()
 
         self.used_words.append(self.word)
 